@@ -0,0 +1,86 @@
+"""Benchmark the byte-level fixed-width reader against the previous str-slicing parser."""
+
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from soa_weather.config import setup_logging
+from soa_weather.read import _parse_stations_txt
+
+# ══════════════════════════════════════════════════════════════════════════════
+# USER CONFIGURATION — update these as needed
+# ══════════════════════════════════════════════════════════════════════════════
+N_STATIONS = 130_000  # roughly the size of the full ghcnd-stations.txt
+REPEATS = 5
+# ══════════════════════════════════════════════════════════════════════════════
+
+log = logging.getLogger("soa_weather.benchmark")
+
+
+def make_stations_file(path: Path, n: int) -> None:
+    """Write a synthetic ``ghcnd-stations.txt`` with *n* full-width (85 char) lines."""
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(-90, 90, n)
+    lon = rng.uniform(-180, 180, n)
+    elev = rng.uniform(-50, 4000, n)
+    lines = [
+        f"US{i:09d} {lat[i]:8.4f} {lon[i]:9.4f} {elev[i]:6.1f} NY "
+        f"{'STATION ' + str(i):<30} GSN HCN {i % 100000:05d}"
+        for i in range(n)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def legacy_parse_stations_txt(station_file: Path) -> pl.DataFrame:
+    """The str-based parser that ``_parse_stations_txt`` used before the byte-level reader."""
+    lines = [line for line in station_file.read_text().splitlines() if line.strip()]
+    raw = pl.DataFrame({"line": lines})
+    return (
+        raw.with_columns(
+            pl.col("line").str.slice(0, 11).str.strip_chars().alias("station_id"),
+            pl.col("line").str.slice(12, 8).str.strip_chars().alias("latitude"),
+            pl.col("line").str.slice(21, 9).str.strip_chars().alias("longitude"),
+            pl.col("line").str.slice(31, 6).str.strip_chars().alias("elevation"),
+            pl.col("line").str.slice(38, 2).str.strip_chars().alias("state"),
+            pl.col("line").str.slice(41, 30).str.strip_chars().alias("station_name"),
+        )
+        .drop("line")
+        .with_columns(
+            pl.col("latitude").cast(pl.Float64).round(2),
+            pl.col("longitude").cast(pl.Float64).round(2),
+            pl.col("elevation").cast(pl.Float64).cast(pl.Int64),
+        )
+    )
+
+
+def best_of(func, path: Path) -> tuple[float, pl.DataFrame]:
+    """Return the fastest of REPEATS runs (seconds) and the last result."""
+    times = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        result = func(path)
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+
+# ── Main ─────────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    setup_logging()
+    logging.getLogger("soa_weather.read").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ghcnd-stations.txt"
+        make_stations_file(path, N_STATIONS)
+        log.info("Synthetic stations file: %s lines", f"{N_STATIONS:,}")
+
+        legacy_s, legacy = best_of(legacy_parse_stations_txt, path)
+        new_s, new = best_of(_parse_stations_txt, path)
+
+    assert legacy.equals(new), "parsers disagree"
+    log.info("Legacy str slicing:      %.3f s", legacy_s)
+    log.info("Byte-level fixed-width:  %.3f s", new_s)
+    log.info("Speedup:                 %.1fx", legacy_s / new_s)
@@ -0,0 +1,323 @@
+"""Shared, lock-safe, content-addressed download cache.
+
+Several jobs (possibly on different hosts sharing a volume) can point at the same
+cache directory.  For each URL, one process downloads while the others block on an
+advisory file lock and then reuse the result.  Files only ever appear through an
+atomic rename, so readers never see a partial download.
+
+Layout under the cache root::
+
+    objects/<sha256[:2]>/<sha256>   downloaded content, named by its hash
+    refs/<key>.json                 URL -> object hash, size and fetch time
+    locks/<key>.lock                one advisory lock per URL
+    tmp/<key>.<host>.<pid>.<id>.part in-flight downloads
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import socket
+import sys
+import time
+import urllib.request
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from .utils import atomic_write_text
+
+log = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1_048_576
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_fd(fd: int, blocking: bool) -> bool:
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.1)
+
+    def _unlock_fd(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock_fd(fd: int, blocking: bool) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: Path, *, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive advisory lock on *path* for the duration of the block.
+
+    Yields ``True`` once the lock is held.  With ``blocking=False`` it yields
+    ``False`` immediately if another holder has the lock.  Locks are tied to the open
+    file, so they conflict between threads as well as between processes.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        locked = _lock_fd(fd, blocking)
+        try:
+            yield locked
+        finally:
+            if locked:
+                _unlock_fd(fd)
+    finally:
+        os.close(fd)
+
+
+class DownloadCache:
+    """Content-addressed download cache safe for concurrent processes and hosts.
+
+    Parameters
+    ----------
+    root:
+        Cache directory, e.g. from :func:`~soa_weather.utils.cache_dir`.  Point all
+        jobs that should share downloads at the same directory.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        for sub in ("objects", "refs", "locks", "tmp"):
+            (root / sub).mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Return the cache key (a hash of the URL) used for refs, locks and partials."""
+        return hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def _ref_path(self, key: str) -> Path:
+        return self.root / "refs" / f"{key}.json"
+
+    def _lock_path(self, key: str) -> Path:
+        return self.root / "locks" / f"{key}.lock"
+
+    def object_path(self, sha256: str) -> Path:
+        """Return the path of the object with content hash *sha256*."""
+        return self.root / "objects" / sha256[:2] / sha256
+
+    def lookup(self, url: str) -> dict | None:
+        """Return the ref recorded for *url* (``sha256``, ``size``, ``fetched``), if any."""
+        try:
+            ref = json.loads(self._ref_path(self.key(url)).read_text())
+        except FileNotFoundError:
+            return None
+        return ref if self.object_path(ref["sha256"]).exists() else None
+
+    def _fresh(self, ref: dict | None, newer_than: float | None) -> bool:
+        return ref is not None and (newer_than is None or ref["fetched"] >= newer_than)
+
+    def fetch(
+        self,
+        url: str,
+        *,
+        newer_than: float | None = None,
+        reporthook: Callable[[int, int, int], None] | None = None,
+    ) -> Path:
+        """Return the cached object for *url*, downloading it if needed.
+
+        Only one process downloads a given URL at a time; others wait on its lock
+        and reuse the result.
+
+        Parameters
+        ----------
+        url:
+            Source URL (anything :func:`urllib.request.urlopen` accepts).
+        newer_than:
+            Unix timestamp; a cached copy fetched before it is re-downloaded.  Pass
+            the time the refresh was requested, so that jobs waiting behind another
+            job's refresh reuse it instead of downloading again.
+        reporthook:
+            Optional ``urlretrieve``-style progress callback.
+
+        Returns
+        -------
+        Path
+            Path to the read-only cached object.  Never replace its content in place.
+        """
+        ref = self.lookup(url)
+        if self._fresh(ref, newer_than):
+            return self.object_path(ref["sha256"])
+
+        key = self.key(url)
+        with file_lock(self._lock_path(key)):
+            ref = self.lookup(url)
+            if self._fresh(ref, newer_than):
+                log.info("[CACHE] Reusing %s fetched by another job", url)
+                return self.object_path(ref["sha256"])
+
+            # Holding the lock means any partial for this key is an orphan
+            self._remove_partials(key)
+            obj = self._download(url, key, reporthook)
+            if ref is not None and ref["sha256"] != obj.name:
+                # The refresh superseded the old content; drop it unless still in use
+                self._remove_unused_objects([self.object_path(ref["sha256"])])
+            return obj
+
+    def _download(
+        self,
+        url: str,
+        key: str,
+        reporthook: Callable[[int, int, int], None] | None,
+    ) -> Path:
+        """Stream *url* into a partial file, then rename it into place by content hash."""
+        owner = f"{socket.gethostname()}.{os.getpid()}.{uuid.uuid4().hex[:8]}"
+        part = self.root / "tmp" / f"{key}.{owner}.part"
+        digest = hashlib.sha256()
+        size = 0
+        log.info("[CACHE] Downloading %s", url)
+        try:
+            with urllib.request.urlopen(url) as response, open(part, "wb") as out:
+                total = int(response.headers.get("Content-Length") or -1)
+                block = 0
+                while chunk := response.read(_CHUNK_SIZE):
+                    out.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    block += 1
+                    if reporthook is not None:
+                        reporthook(block, _CHUNK_SIZE, total)
+                out.flush()
+                os.fsync(out.fileno())
+
+            sha256 = digest.hexdigest()
+            obj = self.object_path(sha256)
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            if obj.exists():
+                # Identical content already cached; touch it so hard links read as fresh
+                part.unlink()
+                os.utime(obj)
+            else:
+                os.replace(part, obj)
+        finally:
+            part.unlink(missing_ok=True)
+
+        ref = {"url": url, "sha256": sha256, "size": size, "fetched": time.time()}
+        atomic_write_text(self._ref_path(key), json.dumps(ref))
+        log.info("[CACHE] Stored %s (%.1f MB) as %s", url, size / 1_048_576, sha256[:12])
+        return obj
+
+    def _remove_partials(self, key: str) -> int:
+        removed = 0
+        for part in (self.root / "tmp").glob(f"{key}.*.part"):
+            part.unlink(missing_ok=True)
+            removed += 1
+        if removed:
+            log.info("[CACHE] Removed %d orphaned partial download(s)", removed)
+        return removed
+
+    def cleanup_partials(self) -> int:
+        """Delete partial downloads left behind by crashed jobs.
+
+        Partials whose URL lock is currently held belong to a live download and are
+        kept.
+
+        Returns
+        -------
+        int
+            Number of files removed.
+        """
+        keys = {p.name.split(".", 1)[0] for p in (self.root / "tmp").glob("*.part")}
+        removed = 0
+        for key in keys:
+            with file_lock(self._lock_path(key), blocking=False) as locked:
+                if locked:
+                    removed += self._remove_partials(key)
+        return removed
+
+    def _referenced(self) -> set[str]:
+        """Content hashes that some ref currently points to."""
+        shas = set()
+        for path in (self.root / "refs").glob("*.json"):
+            try:
+                shas.add(json.loads(path.read_text())["sha256"])
+            except FileNotFoundError:
+                continue
+        return shas
+
+    def _remove_unused_objects(self, objects: list[Path], *, min_age: float = 0.0) -> int:
+        """Delete the *objects* that no ref points to and that have no other hard link.
+
+        Objects modified less than *min_age* seconds ago are kept.
+        """
+        referenced = self._referenced()
+        now = time.time()
+        removed = 0
+        for obj in objects:
+            try:
+                st = obj.stat()
+            except FileNotFoundError:
+                continue
+            if obj.name in referenced or st.st_nlink > 1 or now - st.st_mtime < min_age:
+                continue
+            obj.unlink(missing_ok=True)
+            removed += 1
+            log.info("[CACHE] Removed unused object %s", obj.name[:12])
+        return removed
+
+    def prune_objects(self, *, min_age: float = 3600.0) -> int:
+        """Delete cached objects that are no longer used.
+
+        An object is unused when no URL's ref points to it and it has no other hard
+        link (e.g. from :meth:`materialize` into a data directory).  A refresh
+        already drops the content it replaces; this sweeps up the rest, such as
+        objects whose refresh crashed before its ref was written.
+
+        Parameters
+        ----------
+        min_age:
+            Seconds since an object was last modified before it may be removed, so
+            a download that has not yet written its ref is left alone.
+
+        Returns
+        -------
+        int
+            Number of objects removed.
+        """
+        objects = [p for p in (self.root / "objects").glob("*/*") if p.is_file()]
+        return self._remove_unused_objects(objects, min_age=min_age)
+
+    def materialize(
+        self,
+        url: str,
+        dest: Path,
+        *,
+        newer_than: float | None = None,
+        reporthook: Callable[[int, int, int], None] | None = None,
+    ) -> Path:
+        """Fetch *url* through the cache and place it at *dest* atomically.
+
+        *dest* is hard-linked to the cached object when both are on the same file
+        system, and copied otherwise.
+        """
+        obj = self.fetch(url, newer_than=newer_than, reporthook=reporthook)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f"{dest.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            try:
+                os.link(obj, tmp)
+            except OSError:
+                shutil.copyfile(obj, tmp)
+            os.replace(tmp, dest)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return dest
@@ -0,0 +1,168 @@
+"""Station x year x element completeness matrix computed from ``.dly`` files."""
+
+import logging
+import multiprocessing
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import polars as pl
+
+from .read import CORE_ELEMENTS, find_dly_files, read_dly
+from .schema import COMPLETENESS_SCHEMA
+
+log = logging.getLogger(__name__)
+
+
+def station_completeness(
+    dly_file: Path,
+    elements: Sequence[str] | None = CORE_ELEMENTS,
+) -> pl.DataFrame:
+    """Summarise how complete one station's record is per element and year.
+
+    A day counts as valid when it has a value and no quality flag.  A month counts
+    as missing when it has no valid days at all.  Years without any valid day for an
+    element do not appear in the output.
+
+    Parameters
+    ----------
+    dly_file:
+        Path to the station's ``.dly`` file.
+    elements:
+        Elements to keep (default: the GHCN core elements).  ``None`` keeps all.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per ``(station_id, element, year)`` matching
+        :data:`~soa_weather.schema.COMPLETENESS_SCHEMA`.
+    """
+    obs = read_dly(dly_file, elements=elements, drop_flagged=True)
+
+    return (
+        obs.group_by(
+            "station_id",
+            "element",
+            pl.col("date").dt.year().cast(pl.Int64).alias("year"),
+        )
+        .agg(
+            pl.len().cast(pl.Int64).alias("valid_days"),
+            pl.col("date").dt.month().n_unique().cast(pl.Int64).alias("months_present"),
+        )
+        .with_columns(
+            pl.date(pl.col("year"), 1, 1)
+            .dt.is_leap_year()
+            .cast(pl.Int64)
+            .add(365)
+            .alias("days_in_year"),
+        )
+        .with_columns(
+            (100 * pl.col("valid_days") / pl.col("days_in_year")).round(2).alias("pct_complete"),
+            (12 - pl.col("months_present")).alias("missing_months"),
+        )
+        .select(COMPLETENESS_SCHEMA.names())
+        .cast(dict(COMPLETENESS_SCHEMA))
+    )
+
+
+def compute_completeness(
+    stations: pl.DataFrame,
+    dly_subdir: Path,
+    *,
+    elements: Sequence[str] | None = CORE_ELEMENTS,
+    max_workers: int | None = None,
+    chunksize: int = 64,
+) -> pl.DataFrame:
+    """Build the completeness matrix for every station in *stations* in one parallel pass.
+
+    Each station's ``.dly`` file is summarised by :func:`station_completeness` in a
+    process pool; stations without a file on disk are skipped.
+
+    Parameters
+    ----------
+    stations:
+        Station frame with a ``station_id`` column (e.g. from
+        :func:`~soa_weather.read.load_stations`).
+    dly_subdir:
+        Directory holding the extracted ``.dly`` files.
+    elements:
+        Elements to summarise (default: the GHCN core elements).  ``None`` keeps all.
+    max_workers:
+        Process pool size (default: number of CPUs).
+    chunksize:
+        Number of stations handed to a worker at a time.
+
+    Returns
+    -------
+    pl.DataFrame
+        The completeness matrix sorted by ``station_id``, ``element`` and ``year``.
+    """
+    dly_files = find_dly_files(dly_subdir)
+    paths = [dly_files[s] for s in stations["station_id"].to_list() if s in dly_files]
+    log.info("Computing completeness for %s stations...", f"{len(paths):,}")
+
+    if not paths:
+        return pl.DataFrame(schema=COMPLETENESS_SCHEMA)
+
+    worker = partial(station_completeness, elements=elements)
+    # Polars is multi-threaded, so workers must be spawned rather than forked
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+        frames = list(pool.map(worker, paths, chunksize=chunksize))
+
+    return pl.concat(frames).sort("station_id", "element", "year")
+
+
+def select_complete_stations(
+    completeness: pl.DataFrame | pl.LazyFrame,
+    *,
+    element: str,
+    start_year: int,
+    end_year: int,
+    min_pct: float = 95.0,
+    max_missing_months: int | None = None,
+) -> pl.DataFrame:
+    """Return the stations that meet a completeness threshold in every year of a range.
+
+    Pass a :func:`polars.scan_parquet` frame over a persisted matrix to read only the
+    rows needed for the filter.
+
+    Parameters
+    ----------
+    completeness:
+        Completeness matrix from :func:`compute_completeness`.
+    element:
+        Element to test, e.g. ``"TMAX"``.
+    start_year, end_year:
+        Inclusive year range; every year must pass.
+    min_pct:
+        Minimum ``pct_complete`` required in each year.
+    max_missing_months:
+        Optional cap on ``missing_months`` in each year.
+
+    Returns
+    -------
+    pl.DataFrame
+        A single ``station_id`` column, suitable for a semi-join against the station table.
+    """
+    n_years = end_year - start_year + 1
+
+    passing = pl.col("pct_complete") >= min_pct
+    if max_missing_months is not None:
+        passing = passing & (pl.col("missing_months") <= max_missing_months)
+
+    return (
+        completeness.lazy()
+        .filter(
+            (pl.col("element") == element)
+            & pl.col("year").is_between(start_year, end_year)
+            & passing
+        )
+        .group_by("station_id")
+        .agg(pl.len().alias("years_passing"))
+        .filter(pl.col("years_passing") == n_years)
+        .select("station_id")
+        .sort("station_id")
+        .collect()
+    )
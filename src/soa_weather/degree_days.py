@@ -0,0 +1,451 @@
+"""Heating, cooling and growing degree days from daily TMAX/TMIN.
+
+Degree days are computed from the daily mean temperature in degrees C
+(``(TMAX + TMIN) / 2``):
+
+- **HDD** = ``max(hdd_base - tavg, 0)``, accumulated over heating seasons that start
+  in July by default (the season is labelled by the year it starts in)
+- **CDD** = ``max(tavg - cdd_base, 0)``, accumulated over calendar years
+- **GDD** = ``max(mean(clip(TMAX), clip(TMIN)) - gdd_base, 0)`` with both temperatures
+  clipped to ``[gdd_base, gdd_cap]`` (the "modified" method), accumulated over calendar
+  years
+
+:class:`DegreeDayStore` persists daily rows and the running season totals, so
+appending new days only processes the new rows.
+"""
+
+import json
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import polars as pl
+
+from .cache import file_lock
+from .utils import atomic_write_parquet
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DegreeDayBases:
+    """Base temperatures (degrees C) and season convention for degree days.
+
+    The HDD/CDD default of 18.3 C is the conventional 65 F base.
+    """
+
+    hdd_base: float = 18.3
+    cdd_base: float = 18.3
+    gdd_base: float = 10.0
+    gdd_cap: float = 30.0
+    heating_season_start_month: int = 7
+
+
+DAILY_SCHEMA = pl.Schema(
+    {
+        "station_id": pl.String,
+        "date": pl.Date,
+        "tmax": pl.Float64,
+        "tmin": pl.Float64,
+        "tavg": pl.Float64,
+        "hdd": pl.Float64,
+        "cdd": pl.Float64,
+        "gdd": pl.Float64,
+        "heating_season": pl.Int64,
+        "year": pl.Int64,
+        "hdd_season": pl.Float64,
+        "cdd_season": pl.Float64,
+        "gdd_season": pl.Float64,
+    }
+)
+
+_STATE_SCHEMA = pl.Schema(
+    {
+        "station_id": pl.String,
+        "last_date": pl.Date,
+        "heating_season": pl.Int64,
+        "year": pl.Int64,
+        "hdd_season": pl.Float64,
+        "cdd_season": pl.Float64,
+        "gdd_season": pl.Float64,
+    }
+)
+
+_MONTHLY_COLUMNS = ["station_id", "month", "days", "hdd", "cdd", "gdd"]
+
+UPDATE_LOCK_FILE = ".update.lock"
+
+# Parquet metadata key of state.parquet listing the committed part files
+_PARTS_KEY = "soa_weather.parts"
+
+
+def _daily_values(obs: pl.DataFrame | pl.LazyFrame, bases: DegreeDayBases) -> pl.LazyFrame:
+    """Daily HDD/CDD/GDD (without accumulations) from long-format observations."""
+    element = pl.col("element")
+    tenths = pl.col("value").cast(pl.Float64) / 10
+    tmax = pl.col("tmax")
+    tmin = pl.col("tmin")
+    tavg = pl.col("tavg")
+
+    return (
+        obs.lazy()
+        .filter(element.is_in(["TMAX", "TMIN"]) & pl.col("qflag").is_null())
+        .group_by("station_id", "date")
+        .agg(
+            tenths.filter(element == "TMAX").first().alias("tmax"),
+            tenths.filter(element == "TMIN").first().alias("tmin"),
+        )
+        .drop_nulls(["tmax", "tmin"])
+        .with_columns(((tmax + tmin) / 2).alias("tavg"))
+        .with_columns(
+            (bases.hdd_base - tavg).clip(lower_bound=0).alias("hdd"),
+            (tavg - bases.cdd_base).clip(lower_bound=0).alias("cdd"),
+            (
+                (
+                    tmax.clip(bases.gdd_base, bases.gdd_cap)
+                    + tmin.clip(bases.gdd_base, bases.gdd_cap)
+                )
+                / 2
+                - bases.gdd_base
+            )
+            .clip(lower_bound=0)
+            .alias("gdd"),
+            (
+                pl.col("date").dt.year().cast(pl.Int64)
+                - (pl.col("date").dt.month() < bases.heating_season_start_month).cast(pl.Int64)
+            ).alias("heating_season"),
+            pl.col("date").dt.year().cast(pl.Int64).alias("year"),
+        )
+        .sort("station_id", "date")
+    )
+
+
+def _with_accumulations(daily: pl.LazyFrame) -> pl.LazyFrame:
+    """Add season-to-date HDD (heating season) and CDD/GDD (calendar year) columns."""
+    return daily.with_columns(
+        pl.col("hdd").cum_sum().over("station_id", "heating_season").alias("hdd_season"),
+        pl.col("cdd").cum_sum().over("station_id", "year").alias("cdd_season"),
+        pl.col("gdd").cum_sum().over("station_id", "year").alias("gdd_season"),
+    )
+
+
+def compute_degree_days(
+    obs: pl.DataFrame | pl.LazyFrame,
+    bases: DegreeDayBases = DegreeDayBases(),
+) -> pl.DataFrame:
+    """Compute daily degree days and season-to-date accumulations for every station.
+
+    Parameters
+    ----------
+    obs:
+        Long-format observations (:data:`~soa_weather.schema.OBSERVATIONS_SCHEMA`,
+        e.g. from :func:`~soa_weather.read.read_dly` or
+        :func:`~soa_weather.read.scan_dataset`).  Days flagged by a quality check, or
+        missing either TMAX or TMIN, are skipped.
+    bases:
+        Base temperatures and season convention.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per station-day matching :data:`DAILY_SCHEMA`.
+    """
+    return _with_accumulations(_daily_values(obs, bases)).select(DAILY_SCHEMA.names()).collect()
+
+
+def monthly_degree_days(daily: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+    """Sum daily degree days per station and calendar month (``month`` is the 1st)."""
+    return (
+        daily.lazy()
+        .group_by("station_id", pl.col("date").dt.truncate("1mo").alias("month"))
+        .agg(
+            pl.len().cast(pl.Int64).alias("days"),
+            pl.col("hdd").sum(),
+            pl.col("cdd").sum(),
+            pl.col("gdd").sum(),
+        )
+        .select(_MONTHLY_COLUMNS)
+        .sort("station_id", "month")
+        .collect()
+    )
+
+
+def seasonal_degree_days(daily: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+    """Season totals per station: HDD by heating season, CDD and GDD by calendar year.
+
+    Returns
+    -------
+    pl.DataFrame
+        ``station_id``, ``index`` (``"HDD"``, ``"CDD"`` or ``"GDD"``), ``season`` (the
+        year the season starts in), ``days`` and ``total``.
+    """
+    daily = daily.lazy()
+
+    def totals(index: str, value: str, season: str) -> pl.LazyFrame:
+        return daily.group_by("station_id", pl.col(season).alias("season")).agg(
+            pl.lit(index).alias("index"),
+            pl.len().cast(pl.Int64).alias("days"),
+            pl.col(value).sum().alias("total"),
+        )
+
+    return (
+        pl.concat(
+            [
+                totals("HDD", "hdd", "heating_season"),
+                totals("CDD", "cdd", "year"),
+                totals("GDD", "gdd", "year"),
+            ]
+        )
+        .select("station_id", "index", "season", "days", "total")
+        .sort("station_id", "index", "season")
+        .collect()
+    )
+
+
+def join_stations(frame: pl.DataFrame, stations: pl.DataFrame) -> pl.DataFrame:
+    """Attach station metadata (from :func:`~soa_weather.read.load_stations`) to *frame*."""
+    return frame.join(stations, on="station_id", how="left")
+
+
+class DegreeDayStore:
+    """Persistent degree-day tables that grow by appending new days.
+
+    The store keeps the running season totals of each station in a small state
+    table.  :meth:`update` computes only the days after each station's last stored
+    date and offsets their accumulations by the stored totals, so a new day of data
+    costs one day of work rather than a recompute of the full history.
+
+    Layout::
+
+        bases.json               the DegreeDayBases the store was built with
+        state.parquet            last date and season-to-date totals per station,
+                                 and the names of the committed part files
+        daily/part-*.parquet     appended daily rows
+        monthly/part-*.parquet   per-append monthly partial sums
+        .update.lock             serialises updates
+
+    An append writes its part files first and ``state.parquet`` last, so the state
+    commits it.  Once more than *max_parts* parts are listed, they are merged into
+    one daily and one monthly part.  Parts that the state does not list (replaced by
+    a merge, or left by an interrupted update) are ignored by readers and removed by
+    the next :meth:`update`.
+
+    Parameters
+    ----------
+    root:
+        Directory of the store (created if needed).
+    bases:
+        Base temperatures.  Must match the ones the store was created with.
+    max_parts:
+        Parts per table that trigger a merge.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        bases: DegreeDayBases = DegreeDayBases(),
+        *,
+        max_parts: int = 64,
+    ) -> None:
+        self.root = root
+        self.bases = bases
+        self.max_parts = max_parts
+        (root / "daily").mkdir(parents=True, exist_ok=True)
+        (root / "monthly").mkdir(parents=True, exist_ok=True)
+
+        bases_file = root / "bases.json"
+        if bases_file.exists():
+            stored = DegreeDayBases(**json.loads(bases_file.read_text()))
+            if stored != bases:
+                raise ValueError(f"{root} was built with {stored}, not {bases}")
+        else:
+            bases_file.write_text(json.dumps(asdict(bases), indent=2))
+
+    @property
+    def _state_file(self) -> Path:
+        return self.root / "state.parquet"
+
+    def state(self) -> pl.DataFrame:
+        """Return the last stored date and season-to-date totals per station."""
+        if not self._state_file.exists():
+            return pl.DataFrame(schema=_STATE_SCHEMA)
+        return pl.read_parquet(self._state_file)
+
+    def _parts(self) -> list[str]:
+        """Names of the part files committed by the state."""
+        if not self._state_file.exists():
+            return []
+        recorded = pl.read_parquet_metadata(self._state_file).get(_PARTS_KEY)
+        if recorded is None:
+            # Stores written before the state listed its parts: every part counts
+            return sorted(p.name for p in (self.root / "daily").glob("part-*.parquet"))
+        return json.loads(recorded)
+
+    def _remove_orphans(self, parts: list[str]) -> None:
+        """Delete part files that the state no longer (or never) listed."""
+        committed = set(parts)
+        for table in ("daily", "monthly"):
+            for path in (self.root / table).glob("part-*.parquet"):
+                if path.name not in committed:
+                    log.debug("Removing unlisted degree-day part %s", path)
+                    path.unlink()
+
+    @staticmethod
+    def _new_part() -> str:
+        return f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+
+    def _write_state(self, state: pl.DataFrame, parts: list[str]) -> None:
+        atomic_write_parquet(
+            self._state_file,
+            state.sort("station_id"),
+            metadata={_PARTS_KEY: json.dumps(parts)},
+        )
+
+    def _merge_parts(self, state: pl.DataFrame, parts: list[str]) -> None:
+        """Replace *parts* by one daily and one monthly part holding the same rows."""
+        merged = self._new_part()
+        daily = pl.scan_parquet([self.root / "daily" / name for name in parts])
+        atomic_write_parquet(self.root / "daily" / merged, daily.sort("station_id", "date"))
+        monthly = (
+            pl.scan_parquet([self.root / "monthly" / name for name in parts])
+            .group_by("station_id", "month")
+            .agg(pl.col("days", "hdd", "cdd", "gdd").sum())
+            .select(_MONTHLY_COLUMNS)
+            .sort("station_id", "month")
+        )
+        atomic_write_parquet(self.root / "monthly" / merged, monthly)
+        # The replaced parts stay on disk until the next update, so readers that
+        # listed them before the merge can finish
+        self._write_state(state, [merged])
+        log.info("Merged %d degree-day parts", len(parts))
+
+    def update(self, obs: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+        """Append the degree days for observations newer than each station's last date.
+
+        Days on or before a station's last stored date are ignored (they are already
+        accumulated).
+
+        Updates of the same store from several processes or hosts take turns.
+
+        Returns
+        -------
+        pl.DataFrame
+            The daily rows that were appended.
+        """
+        with file_lock(self.root / UPDATE_LOCK_FILE):
+            return self._update(obs)
+
+    def _update(self, obs: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame:
+        state = self.state()
+        parts = self._parts()
+        self._remove_orphans(parts)
+        obs = obs.lazy()
+        if state.height:
+            # Drop already-stored days before aggregating.  The coarse bound only
+            # uses plain columns, so it reaches the scan when *obs* is a Parquet
+            # dataset; the per-station cut-off then trims the rest.
+            known = state["station_id"].implode()
+            obs = (
+                obs.filter(
+                    (pl.col("date") > state["last_date"].min()) | ~pl.col("station_id").is_in(known)
+                )
+                .join(state.lazy().select("station_id", "last_date"), on="station_id", how="left")
+                .filter(pl.col("last_date").is_null() | (pl.col("date") > pl.col("last_date")))
+                .drop("last_date")
+            )
+        daily = _daily_values(obs, self.bases)
+
+        # Accumulate the new rows, then offset by the stored totals of the same season
+        prior = state.lazy().select(
+            "station_id",
+            pl.col("heating_season").alias("_hs"),
+            pl.col("year").alias("_yr"),
+            pl.col("hdd_season").alias("_hdd0"),
+            pl.col("cdd_season").alias("_cdd0"),
+            pl.col("gdd_season").alias("_gdd0"),
+        )
+
+        def offset(column: str, prior_total: str, season: str, prior_season: str) -> pl.Expr:
+            same_season = pl.col(season) == pl.col(prior_season)
+            return pl.col(column) + pl.when(same_season).then(pl.col(prior_total)).otherwise(0.0)
+
+        new = (
+            _with_accumulations(daily)
+            .join(prior, on="station_id", how="left")
+            .with_columns(
+                offset("hdd_season", "_hdd0", "heating_season", "_hs"),
+                offset("cdd_season", "_cdd0", "year", "_yr"),
+                offset("gdd_season", "_gdd0", "year", "_yr"),
+            )
+            .select(DAILY_SCHEMA.names())
+            .collect()
+        )
+        if new.is_empty():
+            log.info("Degree days already up to date")
+            return new
+
+        part = self._new_part()
+        atomic_write_parquet(self.root / "daily" / part, new)
+        atomic_write_parquet(self.root / "monthly" / part, monthly_degree_days(new))
+
+        latest = (
+            new.group_by("station_id")
+            .agg(pl.all().sort_by("date").last())
+            .select(
+                "station_id",
+                pl.col("date").alias("last_date"),
+                "heating_season",
+                "year",
+                "hdd_season",
+                "cdd_season",
+                "gdd_season",
+            )
+        )
+        state = pl.concat([state.join(latest, on="station_id", how="anti"), latest])
+        # The state goes last: until it lists the new part, readers ignore it
+        parts = [*parts, part]
+        self._write_state(state, parts)
+        if len(parts) > self.max_parts:
+            self._merge_parts(state, parts)
+
+        log.info(
+            "Appended %s degree-day rows for %s stations",
+            f"{new.height:,}",
+            f"{latest.height:,}",
+        )
+        return new
+
+    def _scan_parts(self, table: str, schema: pl.Schema) -> pl.LazyFrame:
+        parts = [self.root / table / name for name in self._parts()]
+        return pl.scan_parquet(parts) if parts else pl.LazyFrame(schema=schema)
+
+    def daily(self) -> pl.LazyFrame:
+        """Lazily scan all stored daily rows."""
+        return self._scan_parts("daily", DAILY_SCHEMA)
+
+    def monthly(self) -> pl.DataFrame:
+        """Monthly totals per station, combining the partial sums of every append."""
+        schema = pl.Schema(
+            {
+                "station_id": pl.String,
+                "month": pl.Date,
+                "days": pl.Int64,
+                "hdd": pl.Float64,
+                "cdd": pl.Float64,
+                "gdd": pl.Float64,
+            }
+        )
+        return (
+            self._scan_parts("monthly", schema)
+            .group_by("station_id", "month")
+            .agg(pl.col("days", "hdd", "cdd", "gdd").sum())
+            .select(_MONTHLY_COLUMNS)
+            .sort("station_id", "month")
+            .collect()
+        )
+
+    def seasonal(self) -> pl.DataFrame:
+        """Season totals per station (see :func:`seasonal_degree_days`)."""
+        return seasonal_degree_days(self.daily())
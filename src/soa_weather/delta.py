@@ -0,0 +1,224 @@
+"""Append-only delta layer on top of the processed observation dataset.
+
+New or corrected observations go into small delta files instead of rewriting base
+partitions.  :func:`~soa_weather.read.scan_dataset` merges them on read: for each
+``(station_id, date, element)`` the most recent write wins.  :func:`compact` folds
+the deltas back into the base once a partition has collected enough of them, which
+keeps reads fast.
+
+Deltas belong to the current version of the dataset::
+
+    deltas/<version>/SEQUENCE                       last sequence number issued
+    deltas/<version>/<partition>/<sequence>.parquet
+
+Each delta is routed to the base partition that holds its rows (the same country
+and period partitions as :func:`~soa_weather.snapshot.commit_snapshot`, or the
+station shards of :func:`~soa_weather.ingest.commit_ingest`).  Compaction writes the
+merged partition as a new content-hashed object and updates ``manifest.json``.
+Released versions under ``versions/`` are never changed.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+import polars as pl
+
+from .cache import file_lock
+from .read import (
+    APPEND_LOCK_FILE,
+    DELTAS_DIR,
+    MANIFEST_FILE,
+    OBSERVATION_KEY,
+    merge_deltas,
+    pending_deltas,
+    read_manifest,
+)
+from .schema import OBSERVATIONS_SCHEMA
+from .snapshot import LOCK_FILE as SNAPSHOT_LOCK_FILE
+from .snapshot import write_object
+from .utils import atomic_write_parquet, atomic_write_text
+
+log = logging.getLogger(__name__)
+
+UNASSIGNED = "unassigned"
+
+
+def _partition_expr(manifest: dict) -> pl.Expr:
+    """Expression naming the base partition each observation belongs to."""
+    if "partition_years" in manifest:
+        years = manifest["partition_years"]
+        return pl.concat_str(
+            pl.col("station_id").str.slice(0, 2),
+            pl.lit("-"),
+            (pl.col("date").dt.year() // years * years).cast(pl.String),
+        )
+    owners = {s: p["name"] for p in manifest["partitions"] for s in p.get("stations", [])}
+    return pl.col("station_id").replace_strict(owners, default=UNASSIGNED, return_dtype=pl.String)
+
+
+def append_delta(dataset_dir: Path, rows: pl.DataFrame) -> int:
+    """Record new or changed observations as a delta on the current dataset version.
+
+    Parameters
+    ----------
+    dataset_dir:
+        Dataset directory holding ``manifest.json``.
+    rows:
+        Observations in :data:`~soa_weather.schema.OBSERVATIONS_SCHEMA`.  Within the
+        batch, the last row for a key wins.
+
+    Returns
+    -------
+    int
+        The sequence number of the delta (later deltas override earlier ones).
+    """
+    rows = (
+        rows.select(OBSERVATIONS_SCHEMA.names())
+        .cast(dict(OBSERVATIONS_SCHEMA))
+        .unique(subset=list(OBSERVATION_KEY), keep="last", maintain_order=True)
+    )
+
+    # commit_snapshot switches versions under the same lock, so the delta always
+    # lands under the version that is current when it is written
+    with file_lock(dataset_dir / APPEND_LOCK_FILE):
+        manifest = read_manifest(dataset_dir)
+        rows = rows.with_columns(_partition_expr(manifest).alias("_partition"))
+        root = dataset_dir / DELTAS_DIR / manifest["version"]
+        root.mkdir(parents=True, exist_ok=True)
+
+        counter = root / "SEQUENCE"
+        seq = (int(counter.read_text()) if counter.exists() else 0) + 1
+        # Persist the counter first, so a crash can never lead to a reused number
+        atomic_write_text(counter, str(seq))
+
+        for (partition,), part in rows.partition_by("_partition", as_dict=True).items():
+            path = root / partition / f"{seq:012d}.parquet"
+            path.parent.mkdir(exist_ok=True)
+            atomic_write_parquet(path, part.drop("_partition"))
+
+    log.info("Appended delta %d: %s rows", seq, f"{rows.height:,}")
+    return seq
+
+
+def delta_stats(dataset_dir: Path) -> pl.DataFrame:
+    """Summarise pending deltas per partition (files, rows, and base rows)."""
+    manifest = read_manifest(dataset_dir)
+    return _delta_stats(manifest, pending_deltas(dataset_dir, manifest))
+
+
+def _delta_stats(manifest: dict, pending: dict[str, list[tuple[int, Path]]]) -> pl.DataFrame:
+    base_rows = {p["name"]: p["rows"] for p in manifest["partitions"]}
+    return pl.DataFrame(
+        {
+            "partition": list(pending),
+            "delta_files": [len(d) for d in pending.values()],
+            "delta_rows": [
+                sum(pl.scan_parquet(path).select(pl.len()).collect().item() for _, path in d)
+                for d in pending.values()
+            ],
+            "base_rows": [base_rows.get(name, 0) for name in pending],
+        },
+        schema={
+            "partition": pl.String,
+            "delta_files": pl.Int64,
+            "delta_rows": pl.Int64,
+            "base_rows": pl.Int64,
+        },
+    )
+
+
+def compact(
+    dataset_dir: Path,
+    *,
+    max_delta_ratio: float = 0.1,
+    max_delta_files: int = 32,
+    force: bool = False,
+) -> list[str]:
+    """Rewrite the partitions whose pending deltas crossed a threshold.
+
+    A partition is compacted when its delta rows reach *max_delta_ratio* of its base
+    rows, when it has at least *max_delta_files* delta files, or when it exists only
+    as deltas.  Appends may continue while compaction runs; deltas that arrive
+    meanwhile stay pending.  Compaction holds the snapshot lock, so
+    :func:`~soa_weather.snapshot.commit_snapshot` and
+    :func:`~soa_weather.snapshot.prune_snapshots` wait until it has finished.
+
+    Delta files folded in by the previous compaction of a partition are deleted, so
+    a reader that opened the dataset before that compaction can still finish.
+
+    Parameters
+    ----------
+    dataset_dir:
+        Dataset directory holding ``manifest.json``.
+    max_delta_ratio:
+        Delta rows, as a fraction of base rows, that trigger a rewrite.
+    max_delta_files:
+        Delta files that trigger a rewrite, however small.
+    force:
+        Compact every partition with pending deltas.
+
+    Returns
+    -------
+    list[str]
+        Names of the compacted partitions.
+    """
+    # New objects are unreferenced until the manifest names them; the snapshot lock
+    # keeps prune_snapshots from deleting them and commit_snapshot from replacing
+    # the version meanwhile
+    with file_lock(dataset_dir / SNAPSHOT_LOCK_FILE):
+        manifest = read_manifest(dataset_dir)
+        # List the deltas once: appends may add partitions while we work
+        pending = pending_deltas(dataset_dir, manifest)
+        stats = {
+            row["partition"]: row for row in _delta_stats(manifest, pending).iter_rows(named=True)
+        }
+        entries = {p["name"]: p for p in manifest["partitions"]}
+
+        compacted = []
+        retired: list[tuple[str, int]] = []
+        for name, deltas in pending.items():
+            row = stats[name]
+            due = (
+                force
+                or row["base_rows"] == 0
+                or row["delta_files"] >= max_delta_files
+                or row["delta_rows"] >= max_delta_ratio * row["base_rows"]
+            )
+            if not due:
+                continue
+
+            old = entries.get(name)
+            base = (
+                pl.scan_parquet(dataset_dir / old["path"])
+                if old
+                else pl.LazyFrame(schema=OBSERVATIONS_SCHEMA)
+            )
+            merged = merge_deltas(base, deltas).sort(*OBSERVATION_KEY).collect()
+            entry = {"name": name, **write_object(dataset_dir, merged), "delta_seq": deltas[-1][0]}
+            if old is None or "stations" in old:
+                entry["stations"] = merged["station_id"].unique().sort().to_list()
+            entries[name] = entry
+            compacted.append(name)
+            retired.append((name, old.get("delta_seq", 0) if old else 0))
+
+        if not compacted:
+            log.info("No partition has crossed the compaction threshold")
+            return compacted
+
+        partitions = sorted(entries.values(), key=lambda p: p["name"])
+        manifest = {
+            **manifest,
+            "rows": sum(p["rows"] for p in partitions),
+            "partitions": partitions,
+        }
+        atomic_write_text(dataset_dir / MANIFEST_FILE, json.dumps(manifest, indent=2))
+
+        root = dataset_dir / DELTAS_DIR / manifest["version"]
+        for name, previous_seq in retired:
+            for path in (root / name).glob("*.parquet"):
+                if int(path.stem) <= previous_seq:
+                    path.unlink(missing_ok=True)
+
+    log.info("Compacted %d partition(s): %s", len(compacted), ", ".join(compacted))
+    return compacted
@@ -0,0 +1,249 @@
+"""Schema-driven fixed-width reader working directly on (memory-mapped) bytes.
+
+GHCN metadata files (stations, countries, inventory) and the ``.dly`` files are all
+fixed-width text.  :func:`read_fixed_width` takes a column spec written in the same
+1-indexed, inclusive column numbers as the GHCN readme and decodes every column with
+vectorised NumPy slicing over the raw bytes, so no Python-level per-line work happens.
+"""
+
+import mmap
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import polars as pl
+
+_NEWLINE = ord("\n")
+_CR = ord("\r")
+_SPACE = ord(" ")
+_POW10 = 10.0 ** np.arange(19)
+
+
+class FixedWidthColumn(NamedTuple):
+    """One column of a fixed-width layout.
+
+    *start* and *end* are 1-indexed and inclusive, matching the layout tables in the
+    GHCN readme (e.g. ``FixedWidthColumn("station_id", 1, 11)``).
+    """
+
+    name: str
+    start: int
+    end: int
+    dtype: pl.DataType = pl.String
+
+    @property
+    def width(self) -> int:
+        return self.end - self.start + 1
+
+
+class LineIndex(NamedTuple):
+    """Start/end byte offsets of the non-blank lines in a buffer (end is exclusive)."""
+
+    starts: np.ndarray
+    ends: np.ndarray
+
+
+def index_lines(buf: np.ndarray) -> LineIndex:
+    """Locate every non-blank line in *buf* (a ``uint8`` array)."""
+    newlines = np.flatnonzero(buf == _NEWLINE)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(buf)]))
+
+    # Drop a trailing CR (Windows line endings)
+    has_cr = (ends > starts) & (buf[np.maximum(ends - 1, 0)] == _CR)
+    ends = ends - has_cr
+
+    # Skip empty lines, then check the (rare) lines that start with whitespace
+    keep = ends > starts
+    for i in np.flatnonzero(keep & (buf[np.minimum(starts, len(buf) - 1)] <= _SPACE)):
+        keep[i] = bool((buf[starts[i] : ends[i]] > _SPACE).any())
+    return LineIndex(starts[keep], ends[keep])
+
+
+def slice_column(buf: np.ndarray, lines: LineIndex, start: int, width: int) -> np.ndarray:
+    """Return ``(n_lines, width)`` bytes at 0-indexed *start* of each line, space-padded."""
+    n = len(lines.starts)
+    if n == 0:
+        return np.empty((0, width), dtype=np.uint8)
+
+    # Fast path: every line has the same length, so the buffer is a strided 2-D view
+    stride = int(lines.starts[1] - lines.starts[0]) if n > 1 else 0
+    line_len = int(lines.ends[0] - lines.starts[0])
+    uniform = (
+        start + width <= line_len
+        and (n == 1 or bool((np.diff(lines.starts) == stride).all()))
+        and bool((lines.ends - lines.starts == line_len).all())
+    )
+    if uniform:
+        first = int(lines.starts[0]) + start
+        if n == 1:
+            return buf[first : first + width].reshape(1, width)
+        return np.lib.stride_tricks.as_strided(
+            buf[first:], shape=(n, width), strides=(stride, 1), writeable=False
+        )
+
+    # General path: gather with per-line bounds, padding short lines with spaces
+    idx = lines.starts[:, None] + start + np.arange(width)[None, :]
+    inside = idx < lines.ends[:, None]
+    out = buf[np.minimum(idx, len(buf) - 1)]
+    out[~inside] = _SPACE
+    return out
+
+
+def _decode_text(raw: np.ndarray, name: str) -> pl.Series:
+    """Decode a byte block to stripped strings (blank fields become ``""``)."""
+    block = np.array(raw, dtype=np.uint8, order="C")
+    width = block.shape[1]
+
+    # Trailing spaces become NULs, which the fixed-width ``S`` dtype drops for free
+    columns = block.T.copy()
+    trailing = np.ones(block.shape[0], dtype=bool)
+    for j in range(width - 1, -1, -1):
+        trailing &= columns[j] <= _SPACE
+        columns[j][trailing] = 0
+    block = np.ascontiguousarray(columns.T)
+
+    text = pl.Series(name, block.view(f"S{width}").ravel(), dtype=pl.Binary).cast(pl.String)
+    if ((columns[0] != 0) & (columns[0] <= _SPACE)).any():
+        text = text.str.strip_chars_start()
+    return text
+
+
+def _decode_number(raw: np.ndarray, dtype: pl.DataType, name: str) -> pl.Series:
+    """Parse plain decimal numbers (``-12``, `` 40.7789``) straight from bytes.
+
+    Digits are accumulated column by column into an integer mantissa, which is then
+    scaled by the number of digits after the decimal point.  Anything else (exponents,
+    ``+`` signs, stray text) falls back to Polars string casting.
+    """
+    columns = np.array(raw, dtype=np.uint8).T.copy()  # (width, n): each column contiguous
+    n = columns.shape[1]
+
+    mantissa = np.zeros(n, dtype=np.int64)
+    n_frac = np.zeros(n, dtype=np.int64)
+    n_digits = np.zeros(n, dtype=np.int64)
+    n_dots = np.zeros(n, dtype=np.int64)
+    negative = np.zeros(n, dtype=bool)
+    other = np.zeros(n, dtype=bool)
+
+    for col in columns:
+        digit = col - np.uint8(ord("0"))  # wraps around for non-digits
+        is_digit = digit < 10
+        is_dot = col == ord(".")
+        is_minus = col == ord("-")
+
+        mantissa = np.where(is_digit, mantissa * 10 + digit, mantissa)
+        n_frac += is_digit & (n_dots > 0)
+        n_digits += is_digit
+        n_dots += is_dot
+        negative |= is_minus
+        other |= ~(is_digit | is_dot | is_minus | (col == _SPACE))
+
+    if other.any() or (n_dots > 1).any() or (dtype == pl.Int64 and n_dots.any()):
+        return (
+            _decode_text(raw, name)
+            .to_frame()
+            .select(pl.when(pl.col(name) != "").then(pl.col(name)).cast(dtype).alias(name))
+            .to_series()
+        )
+
+    mantissa = np.where(negative, -mantissa, mantissa)
+    if dtype == pl.Int64:
+        values = mantissa
+    else:
+        # Exact integer / power of ten gives the correctly rounded float
+        values = mantissa / _POW10[n_frac]
+
+    series = pl.Series(name, values, dtype=dtype)
+    valid = n_digits > 0
+    if valid.all():
+        return series
+    return series.to_frame().select(pl.when(pl.Series(valid)).then(pl.col(name))).to_series()
+
+
+def decode_column(raw: np.ndarray, dtype: pl.DataType, name: str = "") -> pl.Series:
+    """Decode a ``(n, width)`` byte block into a stripped, typed Polars Series.
+
+    Blank numeric fields become nulls; blank string fields become empty strings.
+    """
+    if dtype == pl.String:
+        return _decode_text(raw, name)
+    if dtype in (pl.Float64, pl.Int64):
+        return _decode_number(raw, dtype, name)
+    return (
+        _decode_text(raw, name)
+        .to_frame()
+        .select(pl.when(pl.col(name) != "").then(pl.col(name)).cast(dtype).alias(name))
+        .to_series()
+    )
+
+
+@contextmanager
+def open_buffer(source: Path | bytes) -> Iterator[np.ndarray]:
+    """Yield the content of a file (memory-mapped) or of raw bytes as a ``uint8`` array.
+
+    The array is only valid inside the ``with`` block.
+    """
+    if isinstance(source, bytes):
+        yield np.frombuffer(source, dtype=np.uint8)
+        return
+
+    with open(source, "rb") as f:
+        if f.seek(0, 2) == 0:
+            yield np.empty(0, dtype=np.uint8)
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield np.frombuffer(mm, dtype=np.uint8)
+    finally:
+        try:
+            mm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with the last one
+            pass
+
+
+def read_fixed_width(
+    source: Path | bytes,
+    columns: Sequence[FixedWidthColumn],
+) -> pl.DataFrame:
+    """Parse a fixed-width file (or in-memory bytes) into typed Polars columns.
+
+    Files are memory-mapped rather than read into Python strings.  Lines shorter
+    than the layout are padded with spaces.  Blank lines are skipped.
+
+    Parameters
+    ----------
+    source:
+        Path to a fixed-width text file, or its raw bytes (e.g. a tar member).
+    columns:
+        The layout.  Output columns follow this order.
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per non-blank line, with one column per :class:`FixedWidthColumn`.
+    """
+    schema = {c.name: c.dtype for c in columns}
+    with open_buffer(source) as buf:
+        return _read_buffer(buf, columns, schema)
+
+
+def _read_buffer(
+    buf: np.ndarray,
+    columns: Sequence[FixedWidthColumn],
+    schema: dict[str, pl.DataType],
+) -> pl.DataFrame:
+    if len(buf) == 0:
+        return pl.DataFrame(schema=schema)
+    lines = index_lines(buf)
+    if len(lines.starts) == 0:
+        return pl.DataFrame(schema=schema)
+    return pl.DataFrame(
+        [
+            decode_column(slice_column(buf, lines, c.start - 1, c.width), c.dtype, c.name)
+            for c in columns
+        ]
+    )
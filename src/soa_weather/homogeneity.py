@@ -0,0 +1,377 @@
+"""Neighbor-station correlation and homogeneity (break) screening.
+
+Each station is compared with its nearest neighbors on monthly anomaly series.
+For every station pair the screen reports the Pearson correlation of the anomalies
+and the Standard Normal Homogeneity Test (SNHT) statistic of their difference series,
+together with the month where the most likely break starts.
+"""
+
+import logging
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from .read import find_dly_files, read_dly
+
+log = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Per-worker memory map of the anomaly matrix, opened once by the pool initializer
+_MATRIX: np.ndarray | None = None
+
+
+def _haversine_km(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Great-circle distance in km, broadcasting over the inputs (degrees)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def find_neighbors(
+    stations: pl.DataFrame,
+    *,
+    k: int = 5,
+    max_distance_km: float = 150.0,
+    chunk_size: int = 2048,
+) -> pl.DataFrame:
+    """Find up to *k* nearest neighbors for every station within *max_distance_km*.
+
+    Distances are computed as a dense block of great-circle distances, *chunk_size*
+    stations at a time, so memory stays at ``chunk_size x n_stations`` floats.
+
+    Parameters
+    ----------
+    stations:
+        Station frame with ``station_id``, ``latitude`` and ``longitude`` columns.
+    k:
+        Maximum number of neighbors per station.
+    max_distance_km:
+        Neighbors further away than this are dropped.
+    chunk_size:
+        Number of stations per distance block.
+
+    Returns
+    -------
+    pl.DataFrame
+        ``station_id``, ``neighbor_id`` and ``distance_km``, nearest first.
+    """
+    ids = stations["station_id"].to_numpy()
+    lat = stations["latitude"].to_numpy().astype(np.float64)
+    lon = stations["longitude"].to_numpy().astype(np.float64)
+    n = len(ids)
+    k = min(k, n - 1)
+
+    src: list[np.ndarray] = []
+    dst: list[np.ndarray] = []
+    dist: list[np.ndarray] = []
+    if k > 0:
+        for start in range(0, n, chunk_size):
+            rows = np.arange(start, min(start + chunk_size, n))
+            d = _haversine_km(lat[rows, None], lon[rows, None], lat[None, :], lon[None, :])
+            d[np.arange(len(rows)), rows] = np.inf  # never pick yourself
+
+            nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+            nearest_d = np.take_along_axis(d, nearest, axis=1)
+            order = np.argsort(nearest_d, axis=1)
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            nearest_d = np.take_along_axis(nearest_d, order, axis=1)
+
+            keep = nearest_d <= max_distance_km
+            src.append(np.repeat(rows, k).reshape(-1, k)[keep])
+            dst.append(nearest[keep])
+            dist.append(nearest_d[keep])
+
+    src_idx = np.concatenate(src) if src else np.empty(0, dtype=np.int64)
+    dst_idx = np.concatenate(dst) if dst else np.empty(0, dtype=np.int64)
+    distances = np.concatenate(dist) if dist else np.empty(0, dtype=np.float64)
+
+    return pl.DataFrame(
+        {
+            "station_id": ids[src_idx],
+            "neighbor_id": ids[dst_idx],
+            "distance_km": distances.round(2),
+        },
+        schema={"station_id": pl.String, "neighbor_id": pl.String, "distance_km": pl.Float64},
+    )
+
+
+def _station_monthly_means(dly_file: Path, element: str, min_days: int) -> pl.DataFrame:
+    """Monthly mean of unflagged daily values for one station and element."""
+    return (
+        read_dly(dly_file, elements=[element], drop_flagged=True)
+        .group_by("station_id", pl.col("date").dt.truncate("1mo").alias("month"))
+        .agg(pl.col("value").mean().alias("value"), pl.len().alias("n_days"))
+        .filter(pl.col("n_days") >= min_days)
+        .select("station_id", "month", "value")
+    )
+
+
+def _row_index(ids: pl.Series, station_ids: list[str]) -> pl.Series:
+    """Map station IDs to their row in *station_ids*."""
+    return ids.replace_strict(
+        station_ids, np.arange(len(station_ids), dtype=np.int64), return_dtype=pl.Int64
+    )
+
+
+def monthly_anomaly_matrix(
+    station_ids: list[str],
+    dly_subdir: Path,
+    *,
+    element: str = "TMAX",
+    min_days: int = 20,
+    max_workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Build a dense ``(station x month)`` matrix of monthly anomalies.
+
+    Monthly means (months with at least *min_days* unflagged days) are read in a
+    process pool, and each station's calendar-month climatology is subtracted.
+    Gaps are ``NaN``.  Rows follow *station_ids*; stations without a ``.dly`` file
+    are all-``NaN``.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The anomaly matrix and the matching ``datetime64[M]`` month index.
+    """
+    dly_files = find_dly_files(dly_subdir)
+    paths = [dly_files[s] for s in station_ids if s in dly_files]
+    log.info("Reading monthly %s means for %s stations...", element, f"{len(paths):,}")
+
+    if paths:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            frames = list(
+                pool.map(
+                    _station_monthly_means,
+                    paths,
+                    [element] * len(paths),
+                    [min_days] * len(paths),
+                    chunksize=32,
+                )
+            )
+        monthly = pl.concat(frames)
+    else:
+        monthly = pl.DataFrame(
+            schema={"station_id": pl.String, "month": pl.Date, "value": pl.Float64}
+        )
+
+    if monthly.is_empty():
+        return np.full((len(station_ids), 0), np.nan), np.empty(0, dtype="datetime64[M]")
+
+    monthly = monthly.with_columns(
+        (
+            pl.col("value") - pl.col("value").mean().over("station_id", pl.col("month").dt.month())
+        ).alias("anomaly"),
+        (pl.col("month").dt.year() * 12 + pl.col("month").dt.month() - 1).alias("month_idx"),
+    )
+    first = monthly["month_idx"].min()
+    n_months = monthly["month_idx"].max() - first + 1
+
+    rows = _row_index(monthly["station_id"], station_ids).to_numpy()
+    cols = (monthly["month_idx"] - first).to_numpy()
+
+    matrix = np.full((len(station_ids), n_months), np.nan)
+    matrix[rows, cols] = monthly["anomaly"].to_numpy()
+
+    months = np.arange(n_months) + np.datetime64(f"{first // 12:04d}-{first % 12 + 1:02d}", "M")
+    return matrix, months
+
+
+def pair_statistics(a: np.ndarray, b: np.ndarray, min_overlap: int = 60) -> dict[str, np.ndarray]:
+    """Correlation and SNHT break statistics for a batch of aligned series pairs.
+
+    Parameters
+    ----------
+    a, b:
+        ``(n_pairs, n_months)`` arrays of anomalies with ``NaN`` gaps.
+    min_overlap:
+        Pairs sharing fewer valid months get ``NaN`` statistics.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        ``n_overlap``, ``correlation``, ``snht`` (maximum SNHT statistic of the
+        standardised difference series) and ``break_idx`` (column index of the first
+        month after the most likely break, ``-1`` when not computed).
+    """
+    mask = ~np.isnan(a) & ~np.isnan(b)
+    n = mask.sum(axis=1)
+    ok = n >= min_overlap
+    safe_n = np.where(n > 0, n, 1)
+
+    # Pearson correlation over the shared months
+    a0 = np.where(mask, a, 0.0)
+    b0 = np.where(mask, b, 0.0)
+    da = np.where(mask, a0 - (a0.sum(axis=1) / safe_n)[:, None], 0.0)
+    db = np.where(mask, b0 - (b0.sum(axis=1) / safe_n)[:, None], 0.0)
+    denom = np.sqrt((da**2).sum(axis=1) * (db**2).sum(axis=1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = (da * db).sum(axis=1) / denom
+
+    # SNHT on the standardised difference series: T(k) = k*z1^2 + (n-k)*z2^2
+    d = a0 - b0
+    d_mean = d.sum(axis=1) / safe_n
+    d_std = np.sqrt((np.where(mask, d - d_mean[:, None], 0.0) ** 2).sum(axis=1) / safe_n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(mask, (d - d_mean[:, None]) / d_std[:, None], 0.0)
+        nk = np.cumsum(mask, axis=1)
+        sk = np.cumsum(z, axis=1)
+        total = sk[:, -1:] if sk.shape[1] else np.zeros((len(sk), 1))
+        t = nk * (sk / nk) ** 2 + (n[:, None] - nk) * ((total - sk) / (n[:, None] - nk)) ** 2
+    t = np.where(mask & (nk >= 1) & (nk < n[:, None]) & np.isfinite(t), t, -np.inf)
+
+    has_t = ok & (t.shape[1] > 0) & np.isfinite(d_std) & (d_std > 0)
+    k_max = np.argmax(t, axis=1) if t.shape[1] else np.zeros(len(t), dtype=np.int64)
+    snht = np.where(has_t, t.max(axis=1, initial=-np.inf), np.nan)
+    after = mask & (np.arange(mask.shape[1])[None, :] > k_max[:, None])
+    break_idx = np.where(has_t & after.any(axis=1), np.argmax(after, axis=1), -1)
+
+    return {
+        "n_overlap": n.astype(np.int64),
+        "correlation": np.where(ok, corr, np.nan),
+        "snht": snht,
+        "break_idx": break_idx.astype(np.int64),
+    }
+
+
+def _init_worker(matrix_file: Path) -> None:
+    global _MATRIX
+    _MATRIX = np.load(matrix_file, mmap_mode="r")
+
+
+def _pair_chunk(pairs: np.ndarray, min_overlap: int) -> dict[str, np.ndarray]:
+    return pair_statistics(_MATRIX[pairs[:, 0]], _MATRIX[pairs[:, 1]], min_overlap)
+
+
+def screen_homogeneity(
+    stations: pl.DataFrame,
+    dly_subdir: Path,
+    *,
+    country_code: str | None = None,
+    element: str = "TMAX",
+    k: int = 5,
+    max_distance_km: float = 150.0,
+    min_overlap: int = 60,
+    pair_chunk_size: int = 4096,
+    max_workers: int | None = None,
+) -> pl.DataFrame:
+    """Screen every station against its nearest neighbors for breaks in one batch.
+
+    Neighbors come from :func:`find_neighbors`, series from
+    :func:`monthly_anomaly_matrix`, and statistics from :func:`pair_statistics`,
+    evaluated *pair_chunk_size* unique pairs at a time across a process pool.
+
+    Parameters
+    ----------
+    stations:
+        Station frame from :func:`~soa_weather.read.load_stations`.
+    dly_subdir:
+        Directory holding the extracted ``.dly`` files.
+    country_code:
+        Restrict the screen to one country (e.g. ``"US"``).
+    element:
+        Element to compare (default ``"TMAX"``).
+    k, max_distance_km:
+        Neighbor selection, see :func:`find_neighbors`.
+    min_overlap:
+        Minimum number of shared months for statistics to be reported.
+    pair_chunk_size:
+        Number of station pairs evaluated per task.
+    max_workers:
+        Process pool size (default: number of CPUs).
+
+    Returns
+    -------
+    pl.DataFrame
+        One row per station/neighbor with ``distance_km``, ``n_overlap``,
+        ``correlation``, ``snht`` and ``break_month`` (first month after the most
+        likely break; null when not computed).  Sort by ``snht`` to rank suspects.
+    """
+    if country_code is not None:
+        stations = stations.filter(pl.col("country_code") == country_code)
+
+    neighbors = find_neighbors(stations, k=k, max_distance_km=max_distance_km)
+    station_ids = stations["station_id"].to_list()
+    log.info(
+        "Screening %s stations / %s neighbor links for %s",
+        f"{len(station_ids):,}",
+        f"{neighbors.height:,}",
+        element,
+    )
+
+    matrix, months = monthly_anomaly_matrix(
+        station_ids, dly_subdir, element=element, max_workers=max_workers
+    )
+
+    # Statistics are symmetric, so evaluate each unordered pair once
+    links = np.column_stack(
+        [
+            _row_index(neighbors["station_id"], station_ids).to_numpy(),
+            _row_index(neighbors["neighbor_id"], station_ids).to_numpy(),
+        ]
+    ).reshape(-1, 2)
+    pairs = np.unique(np.sort(links, axis=1), axis=0)
+
+    chunks = [pairs[i : i + pair_chunk_size] for i in range(0, len(pairs), pair_chunk_size)]
+    results: list[dict[str, np.ndarray]] = []
+    if chunks:
+        # Workers memory-map one copy of the matrix instead of each unpickling it
+        with tempfile.TemporaryDirectory() as tmp:
+            matrix_file = Path(tmp) / "anomalies.npy"
+            np.save(matrix_file, matrix)
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(matrix_file,),
+            ) as pool:
+                results = list(pool.map(_pair_chunk, chunks, [min_overlap] * len(chunks)))
+
+    def collect(key: str, dtype: type) -> np.ndarray:
+        return np.concatenate([r[key] for r in results]) if results else np.empty(0, dtype)
+
+    ids = np.array(station_ids, dtype=object)
+    break_idx = collect("break_idx", np.int64)
+    found = break_idx >= 0
+    break_month = np.full(len(break_idx), np.datetime64("NaT"), dtype="datetime64[D]")
+    break_month[found] = months[break_idx[found]]
+    stats = pl.DataFrame(
+        {
+            "a": ids[pairs[:, 0]],
+            "b": ids[pairs[:, 1]],
+            "n_overlap": collect("n_overlap", np.int64),
+            "correlation": collect("correlation", np.float64),
+            "snht": collect("snht", np.float64),
+            "break_month": break_month,
+        },
+        schema={
+            "a": pl.String,
+            "b": pl.String,
+            "n_overlap": pl.Int64,
+            "correlation": pl.Float64,
+            "snht": pl.Float64,
+            "break_month": pl.Date,
+        },
+    ).with_columns(pl.col("correlation", "snht").fill_nan(None))
+
+    pair_key = [
+        pl.min_horizontal("station_id", "neighbor_id").alias("a"),
+        pl.max_horizontal("station_id", "neighbor_id").alias("b"),
+    ]
+    return (
+        neighbors.with_columns(pair_key)
+        .join(stats, on=["a", "b"], how="left")
+        .drop("a", "b")
+        .sort("station_id", "distance_km")
+    )
@@ -0,0 +1,370 @@
+"""Sharded, multi-node observation ingest driven by a file-based work queue.
+
+The station list is split into shards recorded in a shared queue directory.  Workers
+on any host that can see the directory claim shards through lease files, keep the
+lease alive with a heartbeat while they work, and publish each shard's Parquet
+partition with an atomic rename.  A lease whose heartbeat stops (crashed worker)
+expires and is taken over by another worker.  Once every shard is done,
+:func:`commit_ingest` stitches the partitions into one dataset manifest.
+
+Queue layout::
+
+    plan.json                      version, shard size, shard names
+    shards/<shard>.json            station IDs in each shard
+    leases/<shard>.lease           current owner; mtime is the last heartbeat
+    leases/<shard>.takeover.lock   serialises takeovers of an expired lease
+    parts/<shard>.parquet          finished partitions
+    done/<shard>.json              completion markers (row counts)
+    manifest.json                  written by commit_ingest
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import polars as pl
+
+from .cache import file_lock
+from .read import MANIFEST_FILE, find_dly_files, read_dly
+from .schema import OBSERVATIONS_SCHEMA
+from .utils import atomic_write_parquet, atomic_write_text
+
+log = logging.getLogger(__name__)
+
+PLAN_FILE = "plan.json"
+LEASE_SECONDS = 300
+
+
+class IngestError(Exception):
+    """Raised when the ingest queue is missing, already planned, or incomplete."""
+
+
+def _now() -> str:
+    return datetime.now(tz=timezone.utc).isoformat(timespec="seconds")
+
+
+def plan_shards(
+    stations: pl.DataFrame,
+    queue_dir: Path,
+    *,
+    version: str,
+    shard_size: int = 500,
+) -> list[str]:
+    """Split *stations* into shards and record them in *queue_dir*.
+
+    Stations are sorted by ID, so the same station list always yields the same shards.
+
+    Parameters
+    ----------
+    stations:
+        Station frame with a ``station_id`` column (e.g. from
+        :func:`~soa_weather.read.load_stations`).
+    queue_dir:
+        Shared directory for the queue (one per archive version).
+    version:
+        Archive version label recorded in the manifest (e.g. ``"2026-10"``).
+    shard_size:
+        Stations per shard.
+
+    Returns
+    -------
+    list[str]
+        The shard names.
+
+    Raises
+    ------
+    IngestError
+        If *queue_dir* already holds a plan.
+    """
+    if (queue_dir / PLAN_FILE).exists():
+        raise IngestError(f"{queue_dir} already has an ingest plan")
+
+    for sub in ("shards", "leases", "parts", "done"):
+        (queue_dir / sub).mkdir(parents=True, exist_ok=True)
+
+    station_ids = stations["station_id"].unique().sort().to_list()
+    shards = []
+    for i, start in enumerate(range(0, len(station_ids), shard_size)):
+        name = f"shard-{i:05d}"
+        atomic_write_text(
+            queue_dir / "shards" / f"{name}.json",
+            json.dumps(
+                {"shard": name, "stations": station_ids[start : start + shard_size]}, indent=2
+            ),
+        )
+        shards.append(name)
+
+    # The plan goes last: its presence means the shard files are complete
+    atomic_write_text(
+        queue_dir / PLAN_FILE,
+        json.dumps(
+            {
+                "version": version,
+                "shard_size": shard_size,
+                "shards": shards,
+                "stations": len(station_ids),
+                "created": _now(),
+            },
+            indent=2,
+        ),
+    )
+    log.info(
+        "Planned %d shards for %s stations in %s",
+        len(shards),
+        f"{len(station_ids):,}",
+        queue_dir,
+    )
+    return shards
+
+
+def _read_plan(queue_dir: Path) -> dict:
+    try:
+        return json.loads((queue_dir / PLAN_FILE).read_text())
+    except FileNotFoundError:
+        raise IngestError(f"No ingest plan in {queue_dir}; run plan_shards first") from None
+
+
+class _Lease:
+    """An exclusive, heartbeat-renewed claim on one shard."""
+
+    def __init__(self, path: Path, owner: str, lease_seconds: float) -> None:
+        self.path = path
+        self.owner = owner
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+
+    @classmethod
+    def try_acquire(cls, path: Path, owner: str, lease_seconds: float) -> "_Lease | None":
+        """Claim *path*, taking over an expired lease; return ``None`` if it is held."""
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+            except FileExistsError:
+                if not cls._steal_if_expired(path, lease_seconds):
+                    return None
+                continue
+            with os.fdopen(fd, "w") as f:
+                json.dump({"owner": owner, "acquired": _now()}, f)
+            lease = cls(path, owner, lease_seconds)
+            lease._thread.start()
+            return lease
+        return None
+
+    @staticmethod
+    def _steal_if_expired(path: Path, lease_seconds: float) -> bool:
+        """Remove *path* if its heartbeat is older than *lease_seconds*."""
+        # The age check and the removal must see the same lease: without the lock, a
+        # second worker could remove the fresh lease the first one just created
+        with file_lock(path.with_name(f"{path.stem}.takeover.lock")):
+            try:
+                age = time.time() - path.stat().st_mtime
+            except FileNotFoundError:
+                return True
+            if age <= lease_seconds:
+                return False
+            path.unlink(missing_ok=True)
+        log.warning("Lease %s expired %.0f s ago; taking over", path.stem, age - lease_seconds)
+        return True
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            if not self.held():
+                log.warning("Lease %s was taken over by another worker", self.path.stem)
+                return
+            os.utime(self.path)
+
+    def held(self) -> bool:
+        """Return True if this worker still owns the lease."""
+        try:
+            return json.loads(self.path.read_text())["owner"] == self.owner
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+
+    def release(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        if self.held():
+            self.path.unlink(missing_ok=True)
+
+
+def _ingest_shard(
+    queue_dir: Path,
+    shard: str,
+    dly_files: dict[str, Path],
+    owner: str,
+) -> int:
+    """Read every station in *shard* and publish its partition and completion marker."""
+    station_ids = json.loads((queue_dir / "shards" / f"{shard}.json").read_text())["stations"]
+    frames = [read_dly(dly_files[s]) for s in station_ids if s in dly_files]
+    obs = pl.concat(frames) if frames else pl.DataFrame(schema=OBSERVATIONS_SCHEMA)
+
+    part = queue_dir / "parts" / f"{shard}.parquet"
+    atomic_write_parquet(part, obs)
+
+    # Re-running a shard rewrites identical content, so a late duplicate is harmless
+    atomic_write_text(
+        queue_dir / "done" / f"{shard}.json",
+        json.dumps(
+            {
+                "shard": shard,
+                "path": f"parts/{part.name}",
+                "rows": obs.height,
+                "stations": station_ids,
+                "worker": owner,
+                "finished": _now(),
+            },
+            indent=2,
+        ),
+    )
+    return obs.height
+
+
+def run_worker(
+    queue_dir: Path,
+    dly_subdir: Path,
+    *,
+    worker_id: str | None = None,
+    lease_seconds: float = LEASE_SECONDS,
+    wait: bool = True,
+    poll_seconds: float = 5.0,
+) -> int:
+    """Claim and ingest shards from *queue_dir* until none are left.
+
+    Start one worker per process on as many hosts as needed; they coordinate only
+    through the queue directory.
+
+    Parameters
+    ----------
+    queue_dir:
+        Queue created by :func:`plan_shards`.
+    dly_subdir:
+        Directory holding the extracted ``.dly`` files on this host.
+    worker_id:
+        Name recorded in leases and markers (default: ``<host>-<pid>``).
+    lease_seconds:
+        A lease without a heartbeat for this long is considered abandoned.
+    wait:
+        Keep polling while other workers hold leases, so that shards from a crashed
+        worker are picked up once their leases expire.  With ``False`` the worker
+        exits as soon as nothing is claimable.
+    poll_seconds:
+        Polling interval while waiting.
+
+    Returns
+    -------
+    int
+        Number of shards this worker completed.
+    """
+    plan = _read_plan(queue_dir)
+    owner = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    dly_files = find_dly_files(dly_subdir)
+    completed = 0
+
+    while True:
+        remaining = [s for s in plan["shards"] if not (queue_dir / "done" / f"{s}.json").exists()]
+        if not remaining:
+            break
+
+        claimed = False
+        for shard in remaining:
+            if (queue_dir / "done" / f"{shard}.json").exists():
+                continue
+            lease = _Lease.try_acquire(
+                queue_dir / "leases" / f"{shard}.lease", owner, lease_seconds
+            )
+            if lease is None:
+                continue
+            claimed = True
+            try:
+                # Another worker may have finished it between our check and the claim
+                if not (queue_dir / "done" / f"{shard}.json").exists():
+                    t0 = time.perf_counter()
+                    rows = _ingest_shard(queue_dir, shard, dly_files, owner)
+                    completed += 1
+                    log.info(
+                        "[%s] %s done: %s rows in %.1f s",
+                        owner,
+                        shard,
+                        f"{rows:,}",
+                        time.perf_counter() - t0,
+                    )
+            finally:
+                lease.release()
+
+        if not claimed:
+            if not wait:
+                break
+            time.sleep(poll_seconds)
+
+    log.info("[%s] No shards left; completed %d", owner, completed)
+    return completed
+
+
+def commit_ingest(queue_dir: Path) -> Path:
+    """Stitch the finished shard partitions into the dataset manifest.
+
+    Returns
+    -------
+    Path
+        Path to ``manifest.json``; read the dataset with
+        :func:`~soa_weather.read.scan_dataset`.
+
+    Raises
+    ------
+    IngestError
+        If any shard has not finished.
+    """
+    plan = _read_plan(queue_dir)
+
+    partitions = []
+    missing = []
+    for shard in plan["shards"]:
+        marker = queue_dir / "done" / f"{shard}.json"
+        if not marker.exists():
+            missing.append(shard)
+            continue
+        done = json.loads(marker.read_text())
+        if not (queue_dir / done["path"]).exists():
+            missing.append(shard)
+            continue
+        partitions.append(
+            {
+                "name": shard,
+                "path": done["path"],
+                "rows": done["rows"],
+                "stations": done["stations"],
+            }
+        )
+    if missing:
+        raise IngestError(f"{len(missing)} shard(s) not finished: {', '.join(missing[:5])}")
+
+    # Partials from crashed writers are never referenced; clear them out
+    for tmp in (queue_dir / "parts").glob("*.tmp"):
+        tmp.unlink(missing_ok=True)
+
+    manifest = queue_dir / MANIFEST_FILE
+    atomic_write_text(
+        manifest,
+        json.dumps(
+            {
+                "version": plan["version"],
+                "created": _now(),
+                "rows": sum(p["rows"] for p in partitions),
+                "partitions": partitions,
+            },
+            indent=2,
+        ),
+    )
+    log.info(
+        "Committed %s: %d partitions, %s rows",
+        plan["version"],
+        len(partitions),
+        f"{sum(p['rows'] for p in partitions):,}",
+    )
+    return manifest
@@ -1,11 +1,26 @@
 """CLI entry point for soa-weather."""
 
+import argparse
 import logging
-import time
+from pathlib import Path
 
+from .cache import DownloadCache
 from .config import setup_logging
-from .read import check_and_download, load_countries, load_stations
-from .utils import data_dir
+from .delta import compact
+from .ingest import LEASE_SECONDS, commit_ingest, plan_shards, run_worker
+from .pipeline import Stage, run_stages
+from .read import (
+    download_file,
+    extract_tarball,
+    filter_stations,
+    find_dly_files,
+    load_countries,
+    load_stations,
+    parse_stations,
+    scan_dataset,
+)
+from .snapshot import commit_snapshot, prune_snapshots
+from .utils import cache_dir, data_dir
 from .write import write_stations_csv
 
 BASE_URL = "https://www.ncei.noaa.gov/pub/data/ghcn/daily/"
@@ -13,44 +28,218 @@ BASE_URL = "https://www.ncei.noaa.gov/pub/data/ghcn/daily/"
 log = logging.getLogger(__name__)
 
 
-def main() -> None:
-    """Download GHCN-Daily data, build the station list, and write output CSV."""
-    setup_logging()
+def build_pipeline(
+    base_url: str,
+    data: Path,
+    cache: DownloadCache | None = None,
+) -> list[Stage]:
+    """Return the download -> parse -> filter -> write stage graph for *data*.
 
-    data = data_dir()
+    Metadata files are parsed as soon as they land, while the ``.dly`` archive is
+    still downloading or extracting; only the final filter waits for the ``.dly`` scan.
+    Downloads go through *cache* when one is given (see :class:`DownloadCache`).
+    """
     station_file = data / "ghcnd-stations.txt"
     country_file = data / "ghcnd-countries.txt"
     tar_file = data / "ghcnd_all.tar.gz"
     dly_subdir = data / "ghcnd_all"
     output_file = data / "stations_output.csv"
 
-    files_to_download = [
-        ("ghcnd-stations.txt", station_file),
-        ("ghcnd-countries.txt", country_file),
-        ("ghcnd_all.tar.gz", tar_file),
+    data.mkdir(parents=True, exist_ok=True)
+
+    def write_output(stations):
+        write_stations_csv(stations, output_file)
+        return output_file
+
+    return [
+        Stage(
+            "download_stations",
+            lambda: download_file(base_url, "ghcnd-stations.txt", station_file, cache),
+        ),
+        Stage(
+            "download_countries",
+            lambda: download_file(base_url, "ghcnd-countries.txt", country_file, cache),
+        ),
+        Stage("download_tar", lambda: download_file(base_url, "ghcnd_all.tar.gz", tar_file, cache)),
+        Stage(
+            "extract",
+            lambda download_tar: extract_tarball(download_tar, data, dly_subdir),
+            deps=("download_tar",),
+        ),
+        Stage(
+            "countries",
+            lambda download_countries: load_countries(download_countries),
+            deps=("download_countries",),
+        ),
+        Stage(
+            "parse_stations",
+            lambda download_stations: parse_stations(download_stations),
+            deps=("download_stations",),
+        ),
+        Stage("dly_files", lambda extract: find_dly_files(extract), deps=("extract",)),
+        Stage(
+            "stations",
+            lambda parse_stations, dly_files, countries: filter_stations(
+                parse_stations, dly_files, countries
+            ),
+            deps=("parse_stations", "dly_files", "countries"),
+        ),
+        Stage("write", write_output, deps=("stations",)),
     ]
 
+
+def _run_pipeline(args: argparse.Namespace) -> None:
+    """Download GHCN-Daily data, build the station list, and write output CSV."""
+    data = data_dir()
+
     log.info("=" * 60)
     log.info("GHCN-Daily Station Loader")
     log.info("Data directory: %s", data)
     log.info("Source:         %s", BASE_URL)
+    log.info("Cache:          %s", cache_dir())
     log.info("=" * 60)
 
-    # Download & extract (skips anything already present)
-    check_and_download(BASE_URL, data, files_to_download, tar_file, dly_subdir)
+    # Download, extract, parse & write, overlapping independent stages
+    run = run_stages(build_pipeline(BASE_URL, data, DownloadCache(cache_dir())))
+
+    log.info("Stations loaded: %s", f"{run.results['stations'].height:,}")
+    run.log_timings()
+    log.info("Done!")
 
-    # Build station list
-    log.info("Loading country lookup...")
-    countries = load_countries(country_file)
 
-    log.info("Parsing station metadata & filtering...")
-    start = time.time()
-    stations = load_stations(station_file, dly_subdir, countries)
-    elapsed = round(time.time() - start, 1)
+def _queue_dir(args: argparse.Namespace) -> Path:
+    return args.queue_dir or data_dir() / "ingest" / args.version
 
-    # Save output
-    write_stations_csv(stations, output_file)
 
-    log.info("Stations loaded: %s", f"{stations.height:,}")
-    log.info("Runtime (parse + filter): %s seconds", elapsed)
-    log.info("Done!")
+def _run_ingest(args: argparse.Namespace) -> None:
+    """Plan, work on, or commit a sharded observation ingest."""
+    data = data_dir()
+    queue = _queue_dir(args)
+    dly_subdir = data / "ghcnd_all"
+
+    if args.action == "plan":
+        countries = load_countries(data / "ghcnd-countries.txt")
+        stations = load_stations(data / "ghcnd-stations.txt", dly_subdir, countries)
+        plan_shards(stations, queue, version=args.version, shard_size=args.shard_size)
+    elif args.action == "work":
+        run_worker(
+            queue,
+            dly_subdir,
+            worker_id=args.worker_id,
+            lease_seconds=args.lease_seconds,
+        )
+    else:
+        commit_ingest(queue)
+
+
+def _run_snapshot(args: argparse.Namespace) -> None:
+    """Store a committed ingest as a new dataset version, then prune old versions."""
+    data = data_dir()
+    source = args.source or data / "ingest" / args.version
+    dataset = args.dataset_dir or data / "dataset"
+
+    tables = {}
+    if (data / "ghcnd-stations.txt").exists():
+        countries = load_countries(data / "ghcnd-countries.txt")
+        tables["stations"] = load_stations(
+            data / "ghcnd-stations.txt", data / "ghcnd_all", countries
+        )
+
+    commit_snapshot(scan_dataset(source), dataset, version=args.version, tables=tables)
+    if args.keep is not None:
+        prune_snapshots(dataset, keep=args.keep)
+
+
+def _run_compact(args: argparse.Namespace) -> None:
+    """Fold pending deltas into the partitions that crossed the threshold."""
+    compact(
+        args.dataset_dir or data_dir() / "dataset",
+        max_delta_ratio=args.max_delta_ratio,
+        max_delta_files=args.max_delta_files,
+        force=args.force,
+    )
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="weather",
+        description="GHCN-Daily data tools. Without a command, runs the station pipeline.",
+    )
+    parser.set_defaults(handler=_run_pipeline)
+    commands = parser.add_subparsers(title="commands")
+
+    ingest = commands.add_parser(
+        "ingest",
+        help="sharded multi-node observation ingest",
+        description="Build the observation dataset with any number of workers on any hosts.",
+    )
+    ingest.set_defaults(handler=_run_ingest)
+    ingest.add_argument("action", choices=["plan", "work", "commit"])
+    ingest.add_argument("--version", required=True, help="archive version label, e.g. 2026-10")
+    ingest.add_argument(
+        "--queue-dir",
+        type=Path,
+        help="shared queue directory (default: <data dir>/ingest/<version>)",
+    )
+    ingest.add_argument("--shard-size", type=int, default=500, help="stations per shard (plan)")
+    ingest.add_argument("--worker-id", help="worker name recorded in leases (work)")
+    ingest.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=LEASE_SECONDS,
+        help="seconds without a heartbeat before a shard is reassigned (work)",
+    )
+
+    snapshot = commands.add_parser(
+        "snapshot",
+        help="store a committed ingest as a dataset version",
+        description="Add a content-hashed version of the observation dataset.",
+    )
+    snapshot.set_defaults(handler=_run_snapshot)
+    snapshot.add_argument("--version", required=True, help="version label, e.g. 2026-10")
+    snapshot.add_argument(
+        "--source",
+        type=Path,
+        help="committed ingest directory (default: <data dir>/ingest/<version>)",
+    )
+    snapshot.add_argument(
+        "--dataset-dir",
+        type=Path,
+        help="versioned dataset directory (default: <data dir>/dataset)",
+    )
+    snapshot.add_argument("--keep", type=int, help="keep only the newest N versions")
+
+    compact_cmd = commands.add_parser(
+        "compact",
+        help="fold pending deltas into the dataset partitions",
+        description="Rewrite the partitions whose delta volume crossed the threshold.",
+    )
+    compact_cmd.set_defaults(handler=_run_compact)
+    compact_cmd.add_argument(
+        "--dataset-dir",
+        type=Path,
+        help="dataset directory (default: <data dir>/dataset)",
+    )
+    compact_cmd.add_argument(
+        "--max-delta-ratio",
+        type=float,
+        default=0.1,
+        help="delta rows, as a fraction of base rows, that trigger a rewrite",
+    )
+    compact_cmd.add_argument(
+        "--max-delta-files",
+        type=int,
+        default=32,
+        help="delta files per partition that trigger a rewrite",
+    )
+    compact_cmd.add_argument(
+        "--force", action="store_true", help="compact every partition with deltas"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the ``weather`` command."""
+    setup_logging()
+    args = _build_parser().parse_args(argv)
+    args.handler(args)
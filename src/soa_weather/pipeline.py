@@ -0,0 +1,167 @@
+"""Dependency-aware stage scheduler for the GHCN-Daily pipeline."""
+
+import logging
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+
+class PipelineError(Exception):
+    """Raised when a stage graph is invalid (unknown dependency, duplicate name, cycle)."""
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One unit of pipeline work.
+
+    *func* is called with the result of each dependency as a keyword argument named
+    after the dependency stage.
+    """
+
+    name: str
+    func: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Wall-clock start/end of a stage, in seconds relative to the pipeline start."""
+
+    name: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class PipelineRun:
+    """Results and timings of a completed :func:`run_stages` call."""
+
+    stages: dict[str, Stage]
+    results: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, StageTiming] = field(default_factory=dict)
+
+    @property
+    def elapsed(self) -> float:
+        return max((t.end for t in self.timings.values()), default=0.0)
+
+    def critical_path(self) -> list[str]:
+        """Return the chain of stages that determined the total runtime.
+
+        Starting from the last stage to finish, repeatedly step back to the
+        dependency that finished latest.
+        """
+        if not self.timings:
+            return []
+        current = max(self.timings.values(), key=lambda t: t.end).name
+        path = [current]
+        while self.stages[current].deps:
+            current = max(self.stages[current].deps, key=lambda d: self.timings[d].end)
+            path.append(current)
+        return path[::-1]
+
+    def log_timings(self) -> None:
+        """Log per-stage timings and the critical path."""
+        critical = set(self.critical_path())
+        log.info("Stage timings (seconds from start):")
+        for t in sorted(self.timings.values(), key=lambda t: t.start):
+            marker = "*" if t.name in critical else " "
+            log.info(
+                " %s %-18s %7.1f -> %7.1f  (%.1f s)", marker, t.name, t.start, t.end, t.duration
+            )
+        log.info("Critical path: %s", " -> ".join(self.critical_path()))
+        log.info("Total runtime: %.1f seconds", self.elapsed)
+
+
+def _check_graph(stages: Sequence[Stage]) -> dict[str, Stage]:
+    """Validate stage names and dependencies; return stages keyed by name."""
+    by_name: dict[str, Stage] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise PipelineError(f"Duplicate stage name: {stage.name!r}")
+        by_name[stage.name] = stage
+
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise PipelineError(f"Stage {stage.name!r} depends on unknown stage {dep!r}")
+
+    # Kahn's algorithm: anything left unvisited sits on a cycle
+    remaining = {s.name: set(s.deps) for s in stages}
+    ready = [name for name, deps in remaining.items() if not deps]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for name, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(name)
+    if remaining:
+        raise PipelineError(f"Dependency cycle between stages: {sorted(remaining)}")
+
+    return by_name
+
+
+def run_stages(stages: Sequence[Stage], *, max_workers: int = 4) -> PipelineRun:
+    """Run *stages* on a thread pool, starting each one as soon as its dependencies finish.
+
+    Parameters
+    ----------
+    stages:
+        The stage graph.  Order does not matter.
+    max_workers:
+        Maximum number of stages running at once.
+
+    Returns
+    -------
+    PipelineRun
+        Stage results and per-stage timings.
+
+    Raises
+    ------
+    PipelineError
+        If the graph is invalid.  Exceptions raised by a stage propagate unchanged
+        after the stages already running have finished; stages not yet started are
+        skipped.
+    """
+    by_name = _check_graph(stages)
+    run = PipelineRun(stages=by_name)
+    t0 = time.perf_counter()
+
+    def call(stage: Stage) -> Any:
+        start = time.perf_counter() - t0
+        log.debug("[START] %s", stage.name)
+        result = stage.func(**{dep: run.results[dep] for dep in stage.deps})
+        end = time.perf_counter() - t0
+        run.timings[stage.name] = StageTiming(stage.name, start, end)
+        log.debug("[DONE]  %s (%.1f s)", stage.name, end - start)
+        return result
+
+    pending = dict(by_name)
+    running: dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if all(dep in run.results for dep in stage.deps):
+                    running[pool.submit(call, stage)] = name
+                    del pending[name]
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    run.results[name] = future.result()
+                except BaseException:
+                    log.error("Stage %r failed; skipping %d pending stage(s)", name, len(pending))
+                    pending.clear()
+                    raise
+
+    return run
@@ -1,19 +1,38 @@
 """Functions for reading and downloading GHCN-Daily data."""
 
+import json
 import logging
-import sys
+import os
 import tarfile
+import threading
 import time
 import urllib.request
-from datetime import datetime, timezone
+from collections.abc import Callable, Collection, Iterator
+from datetime import date, datetime, timezone
 from pathlib import Path
 
+import numpy as np
 import polars as pl
 
+from .cache import DownloadCache, file_lock
+from .fixedwidth import (
+    FixedWidthColumn,
+    LineIndex,
+    decode_column,
+    index_lines,
+    open_buffer,
+    read_fixed_width,
+    slice_column,
+)
+from .schema import OBSERVATIONS_SCHEMA
+
 log = logging.getLogger(__name__)
 
 STALE_DAYS = 30
 
+# Downloads may run on several pipeline threads; only one may prompt at a time
+_PROMPT_LOCK = threading.Lock()
+
 
 def _is_stale(path: Path) -> bool:
     """Return True if *path* was last modified more than STALE_DAYS ago."""
@@ -24,22 +43,120 @@ def _is_stale(path: Path) -> bool:
 
 def _prompt_redownload(path: Path, age_days: int) -> bool:
     """Ask the user whether to re-download a stale file."""
-    answer = input(f"  {path.name} is {age_days} days old. Re-download? [y/N]: ")
+    with _PROMPT_LOCK:
+        answer = input(f"  {path.name} is {age_days} days old. Re-download? [y/N]: ")
     return answer.strip().lower() in ("y", "yes")
 
 
-def _reporthook(block_num: int, block_size: int, total_size: int) -> None:
-    """Print a simple progress bar during download."""
-    downloaded = block_num * block_size
-    if total_size > 0:
-        pct = min(100, downloaded * 100 / total_size)
+def _progress_hook(
+    label: str,
+    *,
+    step_pct: float = 10.0,
+    step_mb: float = 100.0,
+) -> Callable[[int, int, int], None]:
+    """Return a ``urlretrieve``-style hook that logs the progress of one download.
+
+    Downloads run on parallel pipeline threads, so progress is logged as whole lines
+    tagged with *label* (every *step_pct* percent, or every *step_mb* MB when the size
+    is unknown) instead of an in-place bar the threads would overwrite.
+    """
+    next_mark = 0.0
+
+    def hook(block_num: int, block_size: int, total_size: int) -> None:
+        nonlocal next_mark
+        downloaded = block_num * block_size
         mb_down = downloaded / 1_048_576
-        mb_total = total_size / 1_048_576
-        sys.stdout.write(f"\r  {pct:5.1f}%  ({mb_down:,.0f} / {mb_total:,.0f} MB)")
+        if total_size > 0:
+            pct = min(100.0, downloaded * 100 / total_size)
+            if pct < next_mark:
+                return
+            next_mark = (pct // step_pct + 1) * step_pct
+            log.info(
+                "  %s: %5.1f%%  (%s / %s MB)",
+                label,
+                pct,
+                f"{mb_down:,.0f}",
+                f"{total_size / 1_048_576:,.0f}",
+            )
+        elif mb_down >= next_mark:
+            next_mark = (mb_down // step_mb + 1) * step_mb
+            log.info("  %s: %s MB downloaded", label, f"{mb_down:,.0f}")
+
+    return hook
+
+
+def download_file(
+    base_url: str,
+    remote_name: str,
+    local_path: Path,
+    cache: DownloadCache | None = None,
+) -> Path:
+    """Download one GHCN file unless a fresh copy is already on disk.
+
+    Stale files (older than :data:`STALE_DAYS`) prompt for a re-download.  With a
+    *cache*, the file is fetched through the shared :class:`DownloadCache` (one
+    download per URL across concurrent jobs) and then linked into place.
+    Without one, it is downloaded to a partial file and renamed into place.
+    Either way, *local_path* never holds a half-written file.
+    """
+    refresh_requested = None
+    if local_path.exists():
+        size_mb = local_path.stat().st_size / 1_048_576
+        if _is_stale(local_path):
+            mtime = datetime.fromtimestamp(local_path.stat().st_mtime, tz=timezone.utc)
+            age_days = (datetime.now(tz=timezone.utc) - mtime).days
+            log.info(
+                "[STALE] %s is %d days old (%.1f MB)",
+                local_path.name,
+                age_days,
+                size_mb,
+            )
+            if not _prompt_redownload(local_path, age_days):
+                log.info("  Keeping existing file")
+                return local_path
+            refresh_requested = time.time()
+        else:
+            log.info("[SKIP] %s already exists (%.1f MB)", local_path.name, size_mb)
+            return local_path
+
+    url = base_url + remote_name
+    log.info("[DOWNLOAD] %s -> %s", remote_name, local_path)
+    log.info("  Source: %s", url)
+    progress = _progress_hook(remote_name)
+    if cache is not None:
+        # Reuse a cached copy unless it is stale or a refresh was just requested
+        newer_than = refresh_requested or time.time() - STALE_DAYS * 86_400
+        cache.materialize(url, local_path, newer_than=newer_than, reporthook=progress)
     else:
-        mb_down = downloaded / 1_048_576
-        sys.stdout.write(f"\r  {mb_down:,.0f} MB downloaded")
-    sys.stdout.flush()
+        part = local_path.with_name(f"{local_path.name}.part")
+        urllib.request.urlretrieve(url, part, reporthook=progress)
+        os.replace(part, local_path)
+    size_mb = local_path.stat().st_size / 1_048_576
+    log.info("  %s done - %.1f MB", remote_name, size_mb)
+    return local_path
+
+
+def extract_tarball(tar_file: Path, data_dir: Path, dly_subdir: Path) -> Path:
+    """Extract the ``.dly`` archive into *data_dir* unless *dly_subdir* is already populated."""
+    # Concurrent jobs sharing data_dir wait here rather than extracting on top of each other
+    with file_lock(data_dir / ".extract.lock"):
+        # Extract tar.gz if the folder doesn't exist yet (rglob handles nested dirs)
+        if dly_subdir.exists() and any(dly_subdir.rglob("*.dly")):
+            dly_count = sum(1 for _ in dly_subdir.rglob("*.dly"))
+            log.info(
+                "[SKIP] %s/ already extracted (%s .dly files)",
+                dly_subdir.name,
+                f"{dly_count:,}",
+            )
+        else:
+            log.info("[EXTRACT] %s -> %s", tar_file.name, data_dir)
+            log.info("  This may take 10-20 minutes for ~120,000 files...")
+            t0 = time.time()
+            with tarfile.open(tar_file, "r:gz") as tar:
+                tar.extractall(path=data_dir)
+            elapsed = time.time() - t0
+            log.info("  Extraction complete in %.1f minutes", elapsed / 60)
+    return dly_subdir
 
 
 def check_and_download(
@@ -48,82 +165,74 @@ def check_and_download(
     files_to_download: list[tuple[str, Path]],
     tar_file: Path,
     dly_subdir: Path,
+    cache: DownloadCache | None = None,
 ) -> None:
     """Download required GHCN files if missing and extract the tar archive."""
     data_dir.mkdir(parents=True, exist_ok=True)
 
     for remote_name, local_path in files_to_download:
-        if local_path.exists():
-            size_mb = local_path.stat().st_size / 1_048_576
-            if _is_stale(local_path):
-                mtime = datetime.fromtimestamp(local_path.stat().st_mtime, tz=timezone.utc)
-                age_days = (datetime.now(tz=timezone.utc) - mtime).days
-                log.info(
-                    "[STALE] %s is %d days old (%.1f MB)",
-                    local_path.name,
-                    age_days,
-                    size_mb,
-                )
-                if not _prompt_redownload(local_path, age_days):
-                    log.info("  Keeping existing file")
-                    continue
-            else:
-                log.info("[SKIP] %s already exists (%.1f MB)", local_path.name, size_mb)
-                continue
-
-        url = base_url + remote_name
-        log.info("[DOWNLOAD] %s -> %s", remote_name, local_path)
-        log.info("  Source: %s", url)
-        urllib.request.urlretrieve(url, local_path, reporthook=_reporthook)
-        size_mb = local_path.stat().st_size / 1_048_576
-        sys.stdout.write("\n")
-        log.info("  Done - %.1f MB", size_mb)
-
-    # Extract tar.gz if the folder doesn't exist yet (rglob handles nested dirs)
-    if dly_subdir.exists() and any(dly_subdir.rglob("*.dly")):
-        dly_count = sum(1 for _ in dly_subdir.rglob("*.dly"))
-        log.info(
-            "[SKIP] %s/ already extracted (%s .dly files)",
-            dly_subdir.name,
-            f"{dly_count:,}",
-        )
-    else:
-        log.info("[EXTRACT] %s -> %s", tar_file.name, data_dir)
-        log.info("  This may take 10-20 minutes for ~120,000 files...")
-        t0 = time.time()
-        with tarfile.open(tar_file, "r:gz") as tar:
-            tar.extractall(path=data_dir)
-        elapsed = time.time() - t0
-        log.info("  Extraction complete in %.1f minutes", elapsed / 60)
+        download_file(base_url, remote_name, local_path, cache)
+
+    extract_tarball(tar_file, data_dir, dly_subdir)
+
+
+# Layouts use the 1-indexed, inclusive columns of the GHCN-Daily readme
+COUNTRIES_LAYOUT = (
+    FixedWidthColumn("country_code", 1, 2),
+    FixedWidthColumn("country_name", 4, 64),
+)
+
+STATIONS_LAYOUT = (
+    FixedWidthColumn("station_id", 1, 11),
+    FixedWidthColumn("latitude", 13, 20, pl.Float64),
+    FixedWidthColumn("longitude", 22, 30, pl.Float64),
+    FixedWidthColumn("elevation", 32, 37, pl.Float64),
+    FixedWidthColumn("state", 39, 40),
+    FixedWidthColumn("station_name", 42, 71),
+    FixedWidthColumn("gsn_flag", 73, 75),
+    FixedWidthColumn("hcn_crn_flag", 77, 79),
+    FixedWidthColumn("wmo_id", 81, 85),
+)
+
+INVENTORY_LAYOUT = (
+    FixedWidthColumn("station_id", 1, 11),
+    FixedWidthColumn("latitude", 13, 20, pl.Float64),
+    FixedWidthColumn("longitude", 22, 30, pl.Float64),
+    FixedWidthColumn("element", 32, 35),
+    FixedWidthColumn("first_year", 37, 40, pl.Int64),
+    FixedWidthColumn("last_year", 42, 45, pl.Int64),
+)
 
 
 def load_countries(country_file: Path) -> pl.DataFrame:
     """Parse the fixed-width country code file (cols 1-2 = code, 4+ = name)."""
-    rows = []
-    with open(country_file, "r") as f:
-        for line in f:
-            if len(line.strip()) == 0:
-                continue
-            rows.append(
-                {
-                    "country_code": line[0:2].strip(),
-                    "country_name": line[3:].strip(),
-                }
-            )
-    return pl.DataFrame(rows)
+    return read_fixed_width(country_file, COUNTRIES_LAYOUT)
 
 
-_STATION_COLUMNS = [
-    "station_id",
-    "latitude",
-    "longitude",
-    "elevation",
-    "state",
-    "station_name",
-    "gsn_flag",
-    "hcn_crn_flag",
-    "wmo_id",
-]
+def load_inventory(inventory_file: Path) -> pl.DataFrame:
+    """Parse the fixed-width ``ghcnd-inventory.txt`` file.
+
+    Fixed-width layout:
+    -------------------------------------------------------
+    Variable       Columns   Type
+    -------------------------------------------------------
+    ID              1-11     Character
+    LATITUDE       13-20     Real
+    LONGITUDE      22-30     Real
+    ELEMENT        32-35     Character
+    FIRSTYEAR      37-40     Integer
+    LASTYEAR       42-45     Integer
+    -------------------------------------------------------
+
+    Returns one row per station and element with the first and last year of record.
+    """
+    return read_fixed_width(inventory_file, INVENTORY_LAYOUT).with_columns(
+        pl.col("latitude").round(2),
+        pl.col("longitude").round(2),
+    )
+
+
+_STATION_COLUMNS = [c.name for c in STATIONS_LAYOUT]
 
 
 def _parse_stations_txt(station_file: Path) -> pl.DataFrame:
@@ -145,24 +254,13 @@ def _parse_stations_txt(station_file: Path) -> pl.DataFrame:
     -------------------------------------------------------
     """
     log.info("Parsing stations from fixed-width .txt")
-    lines = [line for line in station_file.read_text().splitlines() if line.strip()]
-    raw = pl.DataFrame({"line": lines})
+    # Only decode the columns we keep
+    layout = [c for c in STATIONS_LAYOUT if c.name not in ("gsn_flag", "hcn_crn_flag", "wmo_id")]
 
-    return (
-        raw.with_columns(
-            pl.col("line").str.slice(0, 11).str.strip_chars().alias("station_id"),
-            pl.col("line").str.slice(12, 8).str.strip_chars().alias("latitude"),
-            pl.col("line").str.slice(21, 9).str.strip_chars().alias("longitude"),
-            pl.col("line").str.slice(31, 6).str.strip_chars().alias("elevation"),
-            pl.col("line").str.slice(38, 2).str.strip_chars().alias("state"),
-            pl.col("line").str.slice(41, 30).str.strip_chars().alias("station_name"),
-        )
-        .drop("line")
-        .with_columns(
-            pl.col("latitude").cast(pl.Float64).round(2),
-            pl.col("longitude").cast(pl.Float64).round(2),
-            pl.col("elevation").cast(pl.Float64).cast(pl.Int64),
-        )
+    return read_fixed_width(station_file, layout).with_columns(
+        pl.col("latitude").round(2),
+        pl.col("longitude").round(2),
+        pl.col("elevation").cast(pl.Int64),
     )
 
 
@@ -195,12 +293,13 @@ def _parse_stations_csv(station_file: Path) -> pl.DataFrame:
     )
 
 
-def load_stations(
-    station_file: Path,
-    dly_subdir: Path,
-    countries: pl.DataFrame,
-) -> pl.DataFrame:
-    """Load station metadata, filter to .dly files on disk, and join countries."""
+def find_dly_files(dly_subdir: Path) -> dict[str, Path]:
+    """Map each station ID to its ``.dly`` file under *dly_subdir* (nested dirs included)."""
+    return {p.stem: p for p in dly_subdir.rglob("*.dly")}
+
+
+def parse_stations(station_file: Path) -> pl.DataFrame:
+    """Parse a ``.txt`` or ``.csv`` station file and derive ``country_code``."""
     suffix = station_file.suffix.lower()
     if suffix == ".txt":
         stations = _parse_stations_txt(station_file)
@@ -210,16 +309,18 @@ def load_stations(
         raise ValueError(f"Unsupported station file format: {suffix!r} (expected .txt or .csv)")
 
     # Derive country_code from the first two characters of station_id
-    stations = stations.with_columns(
+    return stations.with_columns(
         pl.col("station_id").str.slice(0, 2).alias("country_code"),
     )
 
-    # Filter to stations whose .dly file exists on disk (rglob handles nested dirs)
-    log.info("Scanning .dly directory...")
-    existing_files = {p.stem for p in dly_subdir.rglob("*.dly")}
-    log.info("  Found %s .dly files", f"{len(existing_files):,}")
 
-    stations = stations.filter(pl.col("station_id").is_in(existing_files))
+def filter_stations(
+    stations: pl.DataFrame,
+    dly_files: dict[str, Path],
+    countries: pl.DataFrame,
+) -> pl.DataFrame:
+    """Keep parsed stations that have a ``.dly`` file and join country names."""
+    stations = stations.filter(pl.col("station_id").is_in(list(dly_files)))
 
     # Join country names
     stations = stations.join(countries, on="country_code", how="left")
@@ -234,3 +335,339 @@ def load_stations(
         "longitude",
         "elevation",
     )
+
+
+def load_stations(
+    station_file: Path,
+    dly_subdir: Path,
+    countries: pl.DataFrame,
+) -> pl.DataFrame:
+    """Load station metadata, filter to .dly files on disk, and join countries."""
+    stations = parse_stations(station_file)
+
+    # Filter to stations whose .dly file exists on disk (rglob handles nested dirs)
+    log.info("Scanning .dly directory...")
+    existing_files = find_dly_files(dly_subdir)
+    log.info("  Found %s .dly files", f"{len(existing_files):,}")
+
+    return filter_stations(stations, existing_files, countries)
+
+
+# GHCN "core" elements: precipitation, snowfall, snow depth, max and min temperature
+CORE_ELEMENTS = ("PRCP", "SNOW", "SNWD", "TMAX", "TMIN")
+
+DLY_MISSING = -9999
+
+_DLY_DAYS = 31
+_DLY_DAY_WIDTH = 8
+_DLY_VALUES_START = 21  # 0-indexed offset of VALUE1
+
+
+def _dly_prefix_lines(
+    buf: np.ndarray,
+    elements: Collection[str] | None,
+    years: tuple[int, int] | None,
+) -> LineIndex:
+    """Index the lines of a ``.dly`` buffer that pass the element and year filters.
+
+    Only the ELEMENT and YEAR bytes of each line are looked at, so rejected lines
+    never have their 31 day blocks decoded.
+    """
+    lines = index_lines(buf)
+    if elements is not None:
+        codes = np.ascontiguousarray(slice_column(buf, lines, 17, 4)).view("S4").ravel()
+        keep = np.isin(codes, [e.encode().ljust(4) for e in elements])
+        lines = LineIndex(lines.starts[keep], lines.ends[keep])
+    if years is not None:
+        year = decode_column(slice_column(buf, lines, 11, 4), pl.Int64).fill_null(0).to_numpy()
+        keep = (year >= years[0]) & (year <= years[1])
+        lines = LineIndex(lines.starts[keep], lines.ends[keep])
+    return lines
+
+
+def _decode_dly(
+    buf: np.ndarray,
+    elements: Collection[str] | None,
+    years: tuple[int, int] | None,
+    drop_flagged: bool,
+) -> pl.DataFrame:
+    if len(buf) == 0:
+        return pl.DataFrame(schema=OBSERVATIONS_SCHEMA)
+    lines = _dly_prefix_lines(buf, elements, years)
+    n = len(lines.starts)
+    if n == 0:
+        return pl.DataFrame(schema=OBSERVATIONS_SCHEMA)
+
+    # One row per line-day: (n * 31, 8) blocks of VALUE(5) MFLAG QFLAG SFLAG
+    days = np.ascontiguousarray(
+        slice_column(buf, lines, _DLY_VALUES_START, _DLY_DAYS * _DLY_DAY_WIDTH)
+    ).reshape(n * _DLY_DAYS, _DLY_DAY_WIDTH)
+    values = decode_column(days[:, :5], pl.Int64).fill_null(DLY_MISSING).to_numpy()
+    keep = values != DLY_MISSING
+    if drop_flagged:
+        keep &= days[:, 6] == ord(" ")
+
+    # Dates, dropping impossible days (e.g. 31 June) in case they carry a value
+    year = decode_column(slice_column(buf, lines, 11, 4), pl.Int64).to_numpy()
+    month = decode_column(slice_column(buf, lines, 15, 2), pl.Int64).to_numpy()
+    month_start = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    month_days = ((month_start + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+    keep &= np.tile(np.arange(1, _DLY_DAYS + 1), n) <= np.repeat(month_days, _DLY_DAYS)
+
+    idx = np.flatnonzero(keep)
+    line_idx = idx // _DLY_DAYS
+    dates = month_start[line_idx].astype("datetime64[D]") + idx % _DLY_DAYS
+    flags = days[idx]
+
+    def flag(offset: int, name: str) -> pl.Series:
+        text = decode_column(flags[:, offset : offset + 1], pl.String, name)
+        return text.to_frame().select(pl.when(pl.col(name) != "").then(pl.col(name))).to_series()
+
+    return pl.DataFrame(
+        [
+            decode_column(slice_column(buf, lines, 0, 11), pl.String, "station_id").gather(
+                line_idx
+            ),
+            pl.Series("date", dates, dtype=pl.Date),
+            decode_column(slice_column(buf, lines, 17, 4), pl.String, "element").gather(line_idx),
+            pl.Series("value", values[idx], dtype=pl.Int64),
+            flag(5, "mflag"),
+            flag(6, "qflag"),
+            flag(7, "sflag"),
+        ]
+    )
+
+
+def read_dly(
+    source: Path | bytes,
+    *,
+    elements: Collection[str] | None = None,
+    years: tuple[int, int] | None = None,
+    drop_flagged: bool = False,
+) -> pl.DataFrame:
+    """Parse a fixed-width ``.dly`` file into one row per station-day-element.
+
+    Fixed-width layout (one line per station-month-element):
+    -------------------------------------------------------
+    Variable       Columns   Type
+    -------------------------------------------------------
+    ID              1-11     Character
+    YEAR           12-15     Integer
+    MONTH          16-17     Integer
+    ELEMENT        18-21     Character
+    VALUE1         22-26     Integer
+    MFLAG1         27-27     Character
+    QFLAG1         28-28     Character
+    SFLAG1         29-29     Character
+    ...            (repeated for days 2-31, 8 columns each)
+    VALUE31       262-266    Integer
+    MFLAG31       267-267    Character
+    QFLAG31       268-268    Character
+    SFLAG31       269-269    Character
+    -------------------------------------------------------
+
+    Missing days (``-9999``) are dropped.  Values are kept in the file's native
+    units (e.g. tenths of a degree C for ``TMAX``/``TMIN``, tenths of mm for ``PRCP``)
+    and blank flags become nulls.
+
+    The element and year filters are checked on each line's prefix bytes before its
+    day values are decoded, so narrow reads cost a fraction of a full one.
+
+    Parameters
+    ----------
+    source:
+        Path to a ``.dly`` file, or its raw bytes (e.g. a tar member, see
+        :func:`iter_dly_tarball`).
+    elements:
+        Only keep these elements (e.g. ``("TMAX", "TMIN")``).
+    years:
+        Only keep years in this inclusive ``(first, last)`` range.
+    drop_flagged:
+        Drop values whose quality flag (QFLAG) is set, i.e. that failed a check.
+    """
+    with open_buffer(source) as buf:
+        return _decode_dly(buf, elements, years, drop_flagged)
+
+
+def iter_dly_tarball(
+    tar_file: Path,
+    *,
+    station_ids: Collection[str] | None = None,
+    elements: Collection[str] | None = None,
+    years: tuple[int, int] | None = None,
+    drop_flagged: bool = False,
+) -> Iterator[tuple[str, pl.DataFrame]]:
+    """Read ``.dly`` members straight from the archive, without extracting it.
+
+    The tarball is streamed once from start to end.  Each member is decoded with
+    :func:`read_dly` using the same filters.
+
+    Parameters
+    ----------
+    tar_file:
+        Path to ``ghcnd_all.tar.gz``.
+    station_ids:
+        Only read these stations (others are skipped without decoding).
+
+    Yields
+    ------
+    tuple[str, pl.DataFrame]
+        ``(station_id, observations)`` for each selected member.
+    """
+    wanted = set(station_ids) if station_ids is not None else None
+    with tarfile.open(tar_file, "r|*") as tar:
+        for member in tar:
+            name = Path(member.name)
+            if not member.isfile() or name.suffix != ".dly":
+                continue
+            if wanted is not None and name.stem not in wanted:
+                continue
+            data = tar.extractfile(member).read()
+            yield (
+                name.stem,
+                read_dly(data, elements=elements, years=years, drop_flagged=drop_flagged),
+            )
+
+
+MATRIX_VALUES_FILE = "values.npy"
+MATRIX_STATION_FILE = "station_id.npy"
+MATRIX_DATE_FILE = "date.npy"
+
+
+def open_station_matrix(matrix_dir: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Open a matrix written by :func:`~soa_weather.write.write_station_matrix`.
+
+    The values are memory-mapped read-only, so opening is instant and slicing only
+    reads the pages touched.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        ``(values, station_ids, dates)`` where ``values[i, j]`` is the observation for
+        ``station_ids[i]`` on ``dates[j]`` (``NaN`` when missing).
+    """
+    values = np.load(matrix_dir / MATRIX_VALUES_FILE, mmap_mode="r")
+    station_ids = np.load(matrix_dir / MATRIX_STATION_FILE)
+    dates = np.load(matrix_dir / MATRIX_DATE_FILE)
+    return values, station_ids, dates
+
+
+MANIFEST_FILE = "manifest.json"
+VERSIONS_DIR = "versions"
+
+
+def read_manifest(dataset_dir: Path, as_of: str | date | None = None) -> dict:
+    """Return the manifest of the current (or an earlier) version of a dataset.
+
+    Parameters
+    ----------
+    dataset_dir:
+        Dataset directory holding ``manifest.json``.
+    as_of:
+        ``None`` for the current version, a version label (e.g. ``"2026-07"``), or a
+        date to get the newest version created on or before that day.  Earlier
+        versions are kept under ``versions/`` by
+        :func:`~soa_weather.snapshot.commit_snapshot`.
+
+    Raises
+    ------
+    ValueError
+        If no version matches *as_of*.
+    """
+    if as_of is None:
+        return json.loads((dataset_dir / MANIFEST_FILE).read_text())
+
+    versions_dir = dataset_dir / VERSIONS_DIR
+    if isinstance(as_of, str):
+        try:
+            return json.loads((versions_dir / f"{as_of}.json").read_text())
+        except FileNotFoundError:
+            raise ValueError(f"No version {as_of!r} in {dataset_dir}") from None
+
+    manifests = [json.loads(p.read_text()) for p in versions_dir.glob("*.json")]
+    eligible = [m for m in manifests if date.fromisoformat(m["created"][:10]) <= as_of]
+    if not eligible:
+        raise ValueError(f"No version of {dataset_dir} was created on or before {as_of}")
+    return max(eligible, key=lambda m: m["created"])
+
+
+DELTAS_DIR = "deltas"
+# Held by appends, and by snapshot commits while they switch the current version
+APPEND_LOCK_FILE = ".delta.lock"
+OBSERVATION_KEY = ("station_id", "date", "element")
+
+
+def pending_deltas(dataset_dir: Path, manifest: dict) -> dict[str, list[tuple[int, Path]]]:
+    """Return the delta files not yet compacted into each partition, oldest first.
+
+    Deltas are written by :func:`~soa_weather.delta.append_delta` under
+    ``deltas/<version>/<partition>/<sequence>.parquet``.  A partition entry's
+    ``delta_seq`` is the last sequence number already compacted into it.
+    """
+    root = dataset_dir / DELTAS_DIR / manifest["version"]
+    folded = {p["name"]: p.get("delta_seq", 0) for p in manifest["partitions"]}
+    pending: dict[str, list[tuple[int, Path]]] = {}
+    for path in sorted(root.glob("*/*.parquet")):
+        seq = int(path.stem)
+        if seq > folded.get(path.parent.name, 0):
+            pending.setdefault(path.parent.name, []).append((seq, path))
+    return pending
+
+
+def merge_deltas(base: pl.LazyFrame, deltas: list[tuple[int, Path]]) -> pl.LazyFrame:
+    """Apply *deltas* (oldest first) on top of *base*; the last write of each key wins.
+
+    The key is ``(station_id, date, element)``.
+    """
+    frames = [base, *(pl.scan_parquet(path) for _, path in deltas)]
+    return pl.concat(frames).unique(subset=list(OBSERVATION_KEY), keep="last", maintain_order=True)
+
+
+def scan_dataset(dataset_dir: Path, *, as_of: str | date | None = None) -> pl.LazyFrame:
+    """Lazily scan the observation dataset described by ``<dataset_dir>/manifest.json``.
+
+    The manifest (written by :func:`~soa_weather.ingest.commit_ingest` or
+    :func:`~soa_weather.snapshot.commit_snapshot`) lists the Parquet partitions; only
+    those files are read, so stray or in-progress files in the directory are ignored.
+
+    The current version includes any pending deltas (see :mod:`soa_weather.delta`).
+    Only the partitions that have deltas are merged; the rest are scanned as they
+    are.  Pass *as_of* to read an earlier snapshot version exactly as it was
+    released (see :func:`read_manifest`).
+    """
+    manifest = read_manifest(dataset_dir, as_of)
+    pending = pending_deltas(dataset_dir, manifest) if as_of is None else {}
+
+    paths = []
+    frames = []
+    for partition in manifest["partitions"]:
+        deltas = pending.pop(partition["name"], None)
+        if deltas:
+            frames.append(merge_deltas(pl.scan_parquet(dataset_dir / partition["path"]), deltas))
+        else:
+            paths.append(dataset_dir / partition["path"])
+    # Deltas for partitions the base does not have yet
+    for deltas in pending.values():
+        frames.append(merge_deltas(pl.LazyFrame(schema=OBSERVATIONS_SCHEMA), deltas))
+
+    if paths:
+        frames.insert(0, pl.scan_parquet(paths))
+    if not frames:
+        return pl.LazyFrame(schema=OBSERVATIONS_SCHEMA)
+    return frames[0] if len(frames) == 1 else pl.concat(frames)
+
+
+def scan_table(dataset_dir: Path, name: str, *, as_of: str | date | None = None) -> pl.LazyFrame:
+    """Lazily scan a side table (e.g. ``"stations"``) stored with a snapshot version.
+
+    Raises
+    ------
+    KeyError
+        If the version has no table called *name*.
+    """
+    manifest = read_manifest(dataset_dir, as_of)
+    try:
+        table = manifest.get("tables", {})[name]
+    except KeyError:
+        raise KeyError(f"Version {manifest['version']!r} has no table {name!r}") from None
+    return pl.scan_parquet(dataset_dir / table["path"])
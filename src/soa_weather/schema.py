@@ -1,6 +1,6 @@
 """Schemas for common datasets to validate the data and to provide metadata for the datasets."""
 
-from polars import Float64, Int64, Schema, String
+from polars import Date, Float64, Int64, Schema, String
 
 COUNTRIES_SCHEMA = Schema(
     {
@@ -21,3 +21,38 @@ STATIONS_SCHEMA = Schema(
         "elevation": Int64,
     }
 )
+
+INVENTORY_SCHEMA = Schema(
+    {
+        "station_id": String,
+        "latitude": Float64,
+        "longitude": Float64,
+        "element": String,
+        "first_year": Int64,
+        "last_year": Int64,
+    }
+)
+
+OBSERVATIONS_SCHEMA = Schema(
+    {
+        "station_id": String,
+        "date": Date,
+        "element": String,
+        "value": Int64,
+        "mflag": String,
+        "qflag": String,
+        "sflag": String,
+    }
+)
+
+COMPLETENESS_SCHEMA = Schema(
+    {
+        "station_id": String,
+        "element": String,
+        "year": Int64,
+        "valid_days": Int64,
+        "days_in_year": Int64,
+        "pct_complete": Float64,
+        "missing_months": Int64,
+    }
+)
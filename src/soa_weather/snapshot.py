@@ -0,0 +1,266 @@
+"""Versioned snapshots of the processed observation dataset.
+
+Each release is a manifest that lists content-hashed Parquet partitions.  The
+partitions are split by country and period (decades by default).  When a partition's
+content is unchanged between releases (most of the historical record), it hashes to
+the same object and is stored once.  Keeping a year of monthly versions therefore
+costs little more than the newest one.  Opening any version reads a single
+manifest.
+
+Dataset layout::
+
+    manifest.json                     the current version
+    versions/<version>.json           every version, in the same format
+    objects/<sha256[:2]>/<sha256>.parquet
+
+Read a version with :func:`~soa_weather.read.scan_dataset` (``as_of=...``) and its
+side tables with :func:`~soa_weather.read.scan_table`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from pathlib import Path
+
+import polars as pl
+
+from .cache import file_lock
+from .read import APPEND_LOCK_FILE, DELTAS_DIR, MANIFEST_FILE, VERSIONS_DIR
+from .utils import atomic_write_text
+
+log = logging.getLogger(__name__)
+
+LOCK_FILE = ".snapshot.lock"
+_VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+_CHUNK_SIZE = 1_048_576
+
+
+class SnapshotError(Exception):
+    """Raised for invalid or duplicate version labels."""
+
+
+def _store_object(dataset_dir: Path, tmp: Path) -> tuple[str, str]:
+    """Move *tmp* into the object store by content hash; return ``(sha256, rel_path)``."""
+    digest = hashlib.sha256()
+    with open(tmp, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    sha256 = digest.hexdigest()
+
+    rel = f"objects/{sha256[:2]}/{sha256}.parquet"
+    obj = dataset_dir / rel
+    if obj.exists():
+        tmp.unlink()
+    else:
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, obj)
+    return sha256, rel
+
+
+def write_object(dataset_dir: Path, df: pl.DataFrame) -> dict:
+    """Write *df* as Parquet into the object store of *dataset_dir*.
+
+    Returns
+    -------
+    dict
+        The manifest entry: ``path`` (relative to *dataset_dir*), ``sha256`` and
+        ``rows``.
+    """
+    tmp = dataset_dir / "objects" / f"{uuid.uuid4().hex}.parquet.tmp"
+    tmp.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        df.write_parquet(tmp, compression="zstd")
+        sha256, rel = _store_object(dataset_dir, tmp)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return {"path": rel, "sha256": sha256, "rows": df.height}
+
+
+def _stage_partitions(
+    obs: pl.LazyFrame, partition_years: int, staging: Path
+) -> dict[tuple[str, int], list[Path]]:
+    """Stream *obs* into per ``(country, period)`` files under *staging* in one pass.
+
+    Returns the staged files of each partition, ordered by country and period.
+    Only one partition at a time needs to fit in memory afterwards.
+    """
+    obs.with_columns(
+        pl.col("station_id").str.slice(0, 2).alias("_country"),
+        (pl.col("date").dt.year() // partition_years * partition_years).alias("_period"),
+    ).sink_parquet(
+        pl.PartitionBy(staging, key=["_country", "_period"], include_key=False), mkdir=True
+    )
+    # Files are laid out as _country=<code>/_period=<year>/<n>.parquet
+    staged: dict[tuple[str, int], list[Path]] = {}
+    for path in sorted(staging.glob("_country=*/_period=*/*.parquet")):
+        country = path.parent.parent.name.partition("=")[2]
+        period = int(path.parent.name.partition("=")[2])
+        staged.setdefault((country, period), []).append(path)
+    return dict(sorted(staged.items()))
+
+
+def commit_snapshot(
+    obs: pl.DataFrame | pl.LazyFrame,
+    dataset_dir: Path,
+    *,
+    version: str,
+    tables: Mapping[str, pl.DataFrame] | None = None,
+    partition_years: int = 10,
+) -> Path:
+    """Store *obs* as a new version of the dataset in *dataset_dir* and make it current.
+
+    Rows are split into one partition per country code and *partition_years* period,
+    and sorted by station, date and element.  *obs* is read once and staged on disk
+    by partition, so only one partition at a time is held in memory.  The Parquet
+    bytes depend only on the rows, so unchanged partitions are shared with earlier
+    versions.  Sharing needs the same Polars version to write both releases.
+
+    Parameters
+    ----------
+    obs:
+        Observations (:data:`~soa_weather.schema.OBSERVATIONS_SCHEMA`), e.g.
+        ``scan_dataset(queue_dir)`` after :func:`~soa_weather.ingest.commit_ingest`.
+    dataset_dir:
+        Dataset directory; created if needed.
+    version:
+        Version label (letters, digits, ``.``, ``_`` and ``-``), e.g. ``"2026-10"``.
+    tables:
+        Small side tables stored with the version, e.g. ``{"stations": stations}``.
+    partition_years:
+        Years per partition.
+
+    Returns
+    -------
+    Path
+        Path to the version manifest.
+
+    Raises
+    ------
+    SnapshotError
+        If *version* is not a valid label or already exists.
+    """
+    if not _VERSION_RE.match(version):
+        raise SnapshotError(f"Invalid version label: {version!r}")
+
+    versions_dir = dataset_dir / VERSIONS_DIR
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    obs = obs.lazy()
+
+    with file_lock(dataset_dir / LOCK_FILE):
+        version_file = versions_dir / f"{version}.json"
+        if version_file.exists():
+            raise SnapshotError(f"Version {version!r} already exists in {dataset_dir}")
+
+        existing = {p.name for p in (dataset_dir / "objects").glob("*/*.parquet")}
+        partitions = []
+        with tempfile.TemporaryDirectory(prefix=".staging-", dir=dataset_dir) as staging:
+            staged = _stage_partitions(obs, partition_years, Path(staging))
+            for (country, period), files in staged.items():
+                df = pl.scan_parquet(files).sort("station_id", "date", "element").collect()
+                partitions.append({"name": f"{country}-{period}", **write_object(dataset_dir, df)})
+
+        stored_tables = {name: write_object(dataset_dir, df) for name, df in (tables or {}).items()}
+
+        current = dataset_dir / MANIFEST_FILE
+        parent = json.loads(current.read_text())["version"] if current.exists() else None
+        manifest = {
+            "version": version,
+            "created": datetime.now(tz=timezone.utc).isoformat(timespec="microseconds"),
+            "parent": parent,
+            "partition_years": partition_years,
+            "rows": sum(p["rows"] for p in partitions),
+            "partitions": partitions,
+            "tables": stored_tables,
+        }
+        text = json.dumps(manifest, indent=2)
+        # Appends read the current version under this lock, so none can write a
+        # delta for the version being replaced once the switch has happened
+        with file_lock(dataset_dir / APPEND_LOCK_FILE):
+            # The version file goes first, so the current manifest never names a missing version
+            atomic_write_text(version_file, text)
+            atomic_write_text(current, text)
+
+    reused = sum(Path(p["path"]).name in existing for p in partitions)
+    log.info(
+        "Committed version %s: %s rows in %d partitions (%d shared with earlier versions)",
+        version,
+        f"{manifest['rows']:,}",
+        len(partitions),
+        reused,
+    )
+    return version_file
+
+
+def list_versions(dataset_dir: Path) -> pl.DataFrame:
+    """List the stored versions, oldest first, flagging the current one."""
+    current = dataset_dir / MANIFEST_FILE
+    current_version = json.loads(current.read_text())["version"] if current.exists() else None
+    manifests = sorted(
+        (json.loads(p.read_text()) for p in (dataset_dir / VERSIONS_DIR).glob("*.json")),
+        key=lambda m: m["created"],
+    )
+    return pl.DataFrame(
+        {
+            "version": [m["version"] for m in manifests],
+            "created": [m["created"] for m in manifests],
+            "rows": [m["rows"] for m in manifests],
+            "partitions": [len(m["partitions"]) for m in manifests],
+            "current": [m["version"] == current_version for m in manifests],
+        },
+        schema={
+            "version": pl.String,
+            "created": pl.String,
+            "rows": pl.Int64,
+            "partitions": pl.Int64,
+            "current": pl.Boolean,
+        },
+    )
+
+
+def prune_snapshots(dataset_dir: Path, *, keep: int = 12) -> int:
+    """Delete all but the newest *keep* versions and the objects only they used.
+
+    The current version is always kept.  Delta logs of earlier versions are
+    removed too, since deltas only ever apply to the current version.
+
+    Returns
+    -------
+    int
+        Number of objects deleted.
+    """
+    with file_lock(dataset_dir / LOCK_FILE):
+        versions = list_versions(dataset_dir)
+        drop = versions.head(max(versions.height - keep, 0)).filter(~pl.col("current"))
+        for version in drop["version"]:
+            (dataset_dir / VERSIONS_DIR / f"{version}.json").unlink()
+            log.info("Removed version %s", version)
+
+        current = set(versions.filter(pl.col("current"))["version"])
+        for deltas in (dataset_dir / DELTAS_DIR).glob("*/"):
+            if deltas.name not in current:
+                shutil.rmtree(deltas)
+                log.info("Removed deltas of superseded version %s", deltas.name)
+
+        referenced = set()
+        for path in [*(dataset_dir / VERSIONS_DIR).glob("*.json"), dataset_dir / MANIFEST_FILE]:
+            if path.exists():
+                manifest = json.loads(path.read_text())
+                entries = [*manifest["partitions"], *manifest.get("tables", {}).values()]
+                referenced.update(e["path"] for e in entries)
+
+        removed = 0
+        objects = dataset_dir / "objects"
+        for obj in [*objects.glob("*/*.parquet"), *objects.glob("*.tmp")]:
+            if obj.relative_to(dataset_dir).as_posix() not in referenced:
+                obj.unlink()
+                removed += 1
+
+    log.info("Pruned %d version(s) and %d unreferenced object(s)", drop.height, removed)
+    return removed
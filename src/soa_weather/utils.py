@@ -1,8 +1,12 @@
 """Shared utility helpers for soa-weather."""
 
+import os
 import platform
+import uuid
 from pathlib import Path
 
+import polars as pl
+
 
 def data_dir() -> Path:
     """Return the default data directory for the current platform.
@@ -15,8 +19,6 @@ def data_dir() -> Path:
 
     The directory is created automatically if it does not already exist.
     """
-    import os
-
     env = os.environ.get("SOA_WEATHER_DATA")
     if env:
         p = Path(env)
@@ -27,3 +29,54 @@ def data_dir() -> Path:
 
     p.mkdir(parents=True, exist_ok=True)
     return p
+
+
+def cache_dir() -> Path:
+    """Return the shared download cache directory.
+
+    Defaults to ``<data_dir>/cache``.  Set ``SOA_WEATHER_CACHE`` to a directory on a
+    shared volume so that concurrent jobs (and hosts) download each file only once.
+
+    The directory is created automatically if it does not already exist.
+    """
+    env = os.environ.get("SOA_WEATHER_CACHE")
+    p = Path(env) if env else data_dir() / "cache"
+
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def _temp_path(path: Path) -> Path:
+    """Return a unique temporary sibling of *path* (same directory, ``.tmp`` suffix)."""
+    return path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write *text* to *path* via a temporary file and an atomic rename.
+
+    Readers see either the previous file or the complete new one, never a partial
+    write.  The temporary file is removed if the write fails.
+    """
+    tmp = _temp_path(path)
+    try:
+        tmp.write_text(text)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def atomic_write_parquet(path: Path, df: pl.DataFrame | pl.LazyFrame, **kwargs) -> None:
+    """Write *df* to *path* as Parquet via a temporary file and an atomic rename.
+
+    A LazyFrame is streamed with :meth:`polars.LazyFrame.sink_parquet`, so it need
+    not fit in memory.  Keyword arguments are passed to the writer.
+    """
+    tmp = _temp_path(path)
+    try:
+        if isinstance(df, pl.LazyFrame):
+            df.sink_parquet(tmp, **kwargs)
+        else:
+            df.write_parquet(tmp, **kwargs)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
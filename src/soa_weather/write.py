@@ -1,10 +1,22 @@
 """Functions for writing GHCN-Daily data to disk."""
 
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
 from pathlib import Path
 
+import numpy as np
 import polars as pl
 
+from .read import (
+    MATRIX_DATE_FILE,
+    MATRIX_STATION_FILE,
+    MATRIX_VALUES_FILE,
+    find_dly_files,
+    read_dly,
+)
+
 log = logging.getLogger(__name__)
 
 
@@ -13,3 +25,134 @@ def write_stations_csv(df: pl.DataFrame, output_file: Path) -> None:
     df.write_csv(output_file)
     log.info("Output saved to: %s", output_file)
     log.info("Preview:\n%s", df)
+
+
+def write_completeness(df: pl.DataFrame, output_file: Path) -> None:
+    """Write a station completeness matrix to a compressed Parquet file."""
+    df.write_parquet(output_file, compression="zstd")
+    log.info("Completeness matrix saved to: %s (%s rows)", output_file, f"{df.height:,}")
+
+
+def _fill_matrix_row(
+    values_file: Path,
+    row: int,
+    dly_file: Path,
+    element: str,
+    start: date,
+    drop_flagged: bool,
+) -> int:
+    """Write one station's observations into row *row* of the memory-mapped matrix."""
+    matrix = np.load(values_file, mmap_mode="r+")
+    n_days = matrix.shape[1]
+
+    end = start + timedelta(days=n_days - 1)
+    obs = read_dly(
+        dly_file, elements=[element], years=(start.year, end.year), drop_flagged=drop_flagged
+    )
+    offsets = (obs["date"] - start).dt.total_days()
+    obs = obs.with_columns(offsets.alias("offset")).filter(
+        pl.col("offset").is_between(0, n_days - 1)
+    )
+
+    matrix[row, obs["offset"].to_numpy()] = obs["value"].to_numpy()
+    matrix.flush()
+    return obs.height
+
+
+def write_station_matrix(
+    stations: pl.DataFrame,
+    dly_subdir: Path,
+    output_dir: Path,
+    *,
+    element: str,
+    start: date,
+    end: date,
+    dtype: type = np.float32,
+    drop_flagged: bool = True,
+    max_workers: int | None = None,
+) -> Path:
+    """Export one element as a dense ``(station x day)`` memory-mapped ``.npy`` matrix.
+
+    The matrix is preallocated on disk filled with ``NaN`` and each station's row is
+    streamed in from its ``.dly`` file by a process pool, so the full matrix is never
+    held in memory.  Values stay in the file's native units (e.g. tenths of mm for
+    ``PRCP``).  ``float32`` is the default because a full-size matrix
+    (20k stations x 25k days) is 2 GB instead of 4 GB.
+
+    Files written to *output_dir*:
+
+    - ``values.npy`` — the ``(n_stations, n_days)`` matrix
+    - ``station_id.npy`` — row labels, in the order of *stations*
+    - ``date.npy`` — ``datetime64[D]`` column labels from *start* to *end*
+
+    Open the result with :func:`~soa_weather.read.open_station_matrix`.
+
+    Parameters
+    ----------
+    stations:
+        Station frame (e.g. from :func:`~soa_weather.read.load_stations`); its row
+        order defines the matrix row order.  Stations without a ``.dly`` file are
+        left as all-``NaN`` rows.
+    dly_subdir:
+        Directory holding the extracted ``.dly`` files.
+    output_dir:
+        Directory for the matrix and its sidecar index arrays (created if needed).
+    element:
+        Element to export, e.g. ``"PRCP"``.
+    start, end:
+        Inclusive date range of the matrix columns.
+    dtype:
+        Floating-point dtype of the matrix.
+    drop_flagged:
+        Leave days with a quality flag as ``NaN``.
+    max_workers:
+        Process pool size (default: number of CPUs).
+
+    Returns
+    -------
+    Path
+        Path to ``values.npy``.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    station_ids = np.array(stations["station_id"].to_list(), dtype="U11")
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1, dtype="datetime64[D]")
+
+    values_file = output_dir / MATRIX_VALUES_FILE
+    matrix = np.lib.format.open_memmap(
+        values_file, mode="w+", dtype=dtype, shape=(len(station_ids), len(dates))
+    )
+    matrix[:] = np.nan
+    matrix.flush()
+    del matrix
+
+    np.save(output_dir / MATRIX_STATION_FILE, station_ids)
+    np.save(output_dir / MATRIX_DATE_FILE, dates)
+
+    dly_files = find_dly_files(dly_subdir)
+    rows = [(row, dly_files[s]) for row, s in enumerate(station_ids) if s in dly_files]
+    log.info(
+        "Writing %s matrix: %s stations x %s days -> %s",
+        element,
+        f"{len(station_ids):,}",
+        f"{len(dates):,}",
+        values_file,
+    )
+
+    if rows:
+        n = len(rows)
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as pool:
+            counts = pool.map(
+                _fill_matrix_row,
+                [values_file] * n,
+                [row for row, _ in rows],
+                [path for _, path in rows],
+                [element] * n,
+                [start] * n,
+                [drop_flagged] * n,
+                chunksize=16,
+            )
+            total = sum(counts)
+        log.info("  Filled %s values from %s stations", f"{total:,}", f"{n:,}")
+
+    return values_file
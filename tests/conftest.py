@@ -0,0 +1,37 @@
+"""Shared fixtures for the soa_weather test suite."""
+
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import pytest
+
+
+def dly_line(
+    station_id: str,
+    year: int,
+    month: int,
+    element: str,
+    values: Sequence[int | None],
+    qflags: dict[int, str] | None = None,
+) -> str:
+    """Build one fixed-width ``.dly`` line; ``None`` values become ``-9999``."""
+    qflags = qflags or {}
+    days = list(values) + [None] * (31 - len(values))
+    body = "".join(
+        f"{-9999 if v is None else v:5d} {qflags.get(day, ' ')} "
+        for day, v in enumerate(days, start=1)
+    )
+    return f"{station_id}{year:04d}{month:02d}{element}{body}"
+
+
+@pytest.fixture()
+def write_dly(tmp_path: Path) -> Callable[..., Path]:
+    """Return a helper that writes ``.dly`` lines to ``<tmp>/ghcnd_all/<station>.dly``."""
+
+    def _write(station_id: str, lines: Sequence[str]) -> Path:
+        path = tmp_path / "ghcnd_all" / f"{station_id}.dly"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n")
+        return path
+
+    return _write
@@ -0,0 +1,159 @@
+"""Tests for soa_weather.cache."""
+
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from soa_weather.cache import DownloadCache, file_lock
+from soa_weather.read import download_file
+
+
+@pytest.fixture()
+def source(tmp_path: Path) -> Path:
+    path = tmp_path / "remote" / "ghcnd-stations.txt"
+    path.parent.mkdir()
+    path.write_bytes(b"station data\n" * 1000)
+    return path
+
+
+def _fetch_in_process(root: str, url: str, log_file: str) -> str:
+    """Child-process entry point: fetch *url*, recording every real download."""
+    cache = DownloadCache(Path(root))
+    download = cache._download
+
+    def slow_download(*args, **kwargs):
+        with open(log_file, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.5)  # widen the race window
+        return download(*args, **kwargs)
+
+    cache._download = slow_download
+    return str(cache.fetch(url))
+
+
+def test_fetch_stores_object_by_content_hash(tmp_path: Path, source: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    obj = cache.fetch(source.as_uri())
+
+    assert obj.read_bytes() == source.read_bytes()
+    assert obj.parent.parent == tmp_path / "cache" / "objects"
+    assert cache.lookup(source.as_uri())["size"] == source.stat().st_size
+    assert list((tmp_path / "cache" / "tmp").iterdir()) == []
+
+
+def test_fetch_reuses_cached_object(tmp_path: Path, source: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    first = cache.fetch(source.as_uri())
+    source.write_bytes(b"changed upstream\n")
+    assert cache.fetch(source.as_uri()) == first
+
+
+def test_fetch_newer_than_refreshes(tmp_path: Path, source: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    first = cache.fetch(source.as_uri())
+    source.write_bytes(b"changed upstream\n")
+    second = cache.fetch(source.as_uri(), newer_than=time.time())
+    assert second != first
+    assert second.read_bytes() == b"changed upstream\n"
+
+
+def test_fetch_single_flight_across_processes(tmp_path: Path, source: Path):
+    root = tmp_path / "cache"
+    log_file = tmp_path / "downloads.log"
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(4) as pool:
+        paths = pool.starmap(_fetch_in_process, [(str(root), source.as_uri(), str(log_file))] * 4)
+
+    assert len(set(paths)) == 1
+    assert len(log_file.read_text().splitlines()) == 1
+    assert Path(paths[0]).read_bytes() == source.read_bytes()
+
+
+def test_cleanup_partials_removes_orphans_only(tmp_path: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    orphan_key = cache.key("file:///orphan")
+    live_key = cache.key("file:///live")
+    orphan = tmp_path / "cache" / "tmp" / f"{orphan_key}.host.1.abc.part"
+    live = tmp_path / "cache" / "tmp" / f"{live_key}.host.2.def.part"
+    orphan.write_bytes(b"half")
+    live.write_bytes(b"half")
+
+    with file_lock(cache._lock_path(live_key)):
+        assert cache.cleanup_partials() == 1
+
+    assert not orphan.exists()
+    assert live.exists()
+
+
+def test_fetch_removes_orphaned_partial(tmp_path: Path, source: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    orphan = tmp_path / "cache" / "tmp" / f"{cache.key(source.as_uri())}.host.1.abc.part"
+    orphan.write_bytes(b"half")
+    cache.fetch(source.as_uri())
+    assert not orphan.exists()
+
+
+def test_refresh_removes_superseded_object(tmp_path: Path, source: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    first = cache.fetch(source.as_uri())
+    source.write_bytes(b"changed upstream\n")
+    second = cache.fetch(source.as_uri(), newer_than=time.time())
+    assert not first.exists()
+    assert [p for p in (tmp_path / "cache" / "objects").glob("*/*")] == [second]
+
+
+def test_refresh_keeps_superseded_object_while_linked(tmp_path: Path, source: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    dest = tmp_path / "data" / "ghcnd-stations.txt"
+    cache.materialize(source.as_uri(), dest)
+    first = cache.fetch(source.as_uri())
+    source.write_bytes(b"changed upstream\n")
+    cache.fetch(source.as_uri(), newer_than=time.time())
+    assert first.exists()
+
+    # Once the data directory has moved on, the sweep drops it
+    dest.unlink()
+    assert cache.prune_objects(min_age=0) == 1
+    assert not first.exists()
+    assert cache.lookup(source.as_uri()) is not None
+
+
+def test_prune_objects_keeps_recent(tmp_path: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    orphan = cache.object_path("ab" * 32)
+    orphan.parent.mkdir(parents=True)
+    orphan.write_bytes(b"unreferenced")
+    assert cache.prune_objects() == 0
+    assert cache.prune_objects(min_age=0) == 1
+
+
+def test_file_lock_non_blocking(tmp_path: Path):
+    lock = tmp_path / "x.lock"
+    with file_lock(lock) as held:
+        assert held
+        with file_lock(lock, blocking=False) as second:
+            assert second is False
+    with file_lock(lock, blocking=False) as again:
+        assert again
+
+
+def test_download_file_through_cache(tmp_path: Path, source: Path):
+    cache = DownloadCache(tmp_path / "cache")
+    base_url = source.parent.as_uri() + "/"
+    first = download_file(base_url, source.name, tmp_path / "a" / source.name, cache)
+    second = download_file(base_url, source.name, tmp_path / "b" / source.name, cache)
+
+    assert first.read_bytes() == source.read_bytes()
+    assert second.read_bytes() == source.read_bytes()
+    assert len(list((tmp_path / "cache" / "objects").rglob("*"))) == 2  # one dir, one object
+
+
+def test_download_file_without_cache_leaves_no_partial(tmp_path: Path, source: Path):
+    dest = tmp_path / "data" / source.name
+    dest.parent.mkdir()
+    download_file(source.parent.as_uri() + "/", source.name, dest)
+    assert dest.read_bytes() == source.read_bytes()
+    assert [p.name for p in dest.parent.iterdir()] == [source.name]
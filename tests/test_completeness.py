@@ -0,0 +1,99 @@
+"""Tests for soa_weather.completeness."""
+
+import calendar
+
+import polars as pl
+import pytest
+
+from soa_weather.completeness import (
+    compute_completeness,
+    select_complete_stations,
+    station_completeness,
+)
+from soa_weather.schema import COMPLETENESS_SCHEMA
+
+from .conftest import dly_line
+
+
+def _full_year(station_id: str, year: int, element: str = "TMAX") -> list[str]:
+    return [
+        dly_line(station_id, year, m, element, [100] * calendar.monthrange(year, m)[1])
+        for m in range(1, 13)
+    ]
+
+
+@pytest.fixture()
+def dly_dir(tmp_path, write_dly):
+    # Complete station: every day of 2019 and 2020
+    write_dly("USW00000001", _full_year("USW00000001", 2019) + _full_year("USW00000001", 2020))
+    # Patchy station: 2019 complete, 2020 has only January (with one flagged day)
+    write_dly(
+        "USW00000002",
+        _full_year("USW00000002", 2019)
+        + [dly_line("USW00000002", 2020, 1, "TMAX", [100] * 31, qflags={1: "I"})],
+    )
+    return tmp_path / "ghcnd_all"
+
+
+def test_station_completeness_full_year(dly_dir):
+    df = station_completeness(dly_dir / "USW00000001.dly")
+    row = df.filter(pl.col("year") == 2020)
+    assert row["valid_days"].item() == 366
+    assert row["days_in_year"].item() == 366
+    assert row["pct_complete"].item() == 100.0
+    assert row["missing_months"].item() == 0
+
+
+def test_station_completeness_excludes_flagged_days(dly_dir):
+    df = station_completeness(dly_dir / "USW00000002.dly")
+    row = df.filter(pl.col("year") == 2020)
+    assert row["valid_days"].item() == 30
+    assert row["missing_months"].item() == 11
+
+
+def test_station_completeness_element_filter(dly_dir):
+    df = station_completeness(dly_dir / "USW00000001.dly", elements=["PRCP"])
+    assert df.is_empty()
+
+
+def test_compute_completeness_all_stations(dly_dir):
+    stations = pl.DataFrame({"station_id": ["USW00000001", "USW00000002", "USW00000003"]})
+    df = compute_completeness(stations, dly_dir, max_workers=2)
+    assert df.schema == COMPLETENESS_SCHEMA
+    assert df["station_id"].unique().sort().to_list() == ["USW00000001", "USW00000002"]
+    assert df.height == 4
+
+
+def test_compute_completeness_no_files(tmp_path):
+    stations = pl.DataFrame({"station_id": ["USW00000001"]})
+    df = compute_completeness(stations, tmp_path)
+    assert df.is_empty()
+    assert df.schema == COMPLETENESS_SCHEMA
+
+
+def test_select_complete_stations(dly_dir):
+    stations = pl.DataFrame({"station_id": ["USW00000001", "USW00000002"]})
+    df = compute_completeness(stations, dly_dir, max_workers=1)
+
+    both = select_complete_stations(df, element="TMAX", start_year=2019, end_year=2019)
+    assert both["station_id"].to_list() == ["USW00000001", "USW00000002"]
+
+    full = select_complete_stations(df, element="TMAX", start_year=2019, end_year=2020)
+    assert full["station_id"].to_list() == ["USW00000001"]
+
+
+def test_select_complete_stations_missing_year_fails(dly_dir):
+    stations = pl.DataFrame({"station_id": ["USW00000001"]})
+    df = compute_completeness(stations, dly_dir, max_workers=1)
+    out = select_complete_stations(df, element="TMAX", start_year=2018, end_year=2020)
+    assert out.is_empty()
+
+
+def test_select_complete_stations_from_parquet(dly_dir, tmp_path):
+    stations = pl.DataFrame({"station_id": ["USW00000001", "USW00000002"]})
+    path = tmp_path / "completeness.parquet"
+    compute_completeness(stations, dly_dir, max_workers=1).write_parquet(path)
+    out = select_complete_stations(
+        pl.scan_parquet(path), element="TMAX", start_year=2020, end_year=2020, min_pct=5.0
+    )
+    assert out["station_id"].to_list() == ["USW00000001", "USW00000002"]
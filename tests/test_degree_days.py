@@ -0,0 +1,230 @@
+"""Tests for soa_weather.degree_days."""
+
+import multiprocessing
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from soa_weather import degree_days
+from soa_weather.degree_days import (
+    DegreeDayBases,
+    DegreeDayStore,
+    compute_degree_days,
+    join_stations,
+    monthly_degree_days,
+    seasonal_degree_days,
+)
+
+
+def _obs(station_id: str, start: date, days: int, tmax: int, tmin: int) -> pl.DataFrame:
+    """Long-format TMAX/TMIN observations (tenths of degrees C) for consecutive days."""
+    dates = [start + timedelta(days=i) for i in range(days)]
+    rows = [
+        (station_id, d, element, value)
+        for d in dates
+        for element, value in (("TMAX", tmax), ("TMIN", tmin))
+    ]
+    return pl.DataFrame(
+        rows,
+        schema={
+            "station_id": pl.String,
+            "date": pl.Date,
+            "element": pl.String,
+            "value": pl.Int64,
+        },
+        orient="row",
+    ).with_columns(
+        pl.lit(None, dtype=pl.String).alias("mflag"),
+        pl.lit(None, dtype=pl.String).alias("qflag"),
+        pl.lit(None, dtype=pl.String).alias("sflag"),
+    )
+
+
+def _update_process(root: str, station_id: str, barrier) -> None:
+    # Widen the gap between writing an update's parts and committing its state
+    write = degree_days.atomic_write_parquet
+
+    def slow_write(path, df, **kwargs):
+        write(path, df, **kwargs)
+        if path.parent.name == "daily":
+            time.sleep(0.3)
+
+    degree_days.atomic_write_parquet = slow_write
+    barrier.wait()
+    DegreeDayStore(Path(root)).update(_obs(station_id, date(2020, 1, 1), 5, 200, 0))
+
+
+def test_daily_values():
+    # tavg = 10 C: 8.3 HDD, no CDD; GDD uses TMAX 20 and TMIN clipped up to 10
+    daily = compute_degree_days(_obs("A", date(2020, 1, 1), 1, 200, 0))
+    row = daily.row(0, named=True)
+    assert row["tavg"] == pytest.approx(10.0)
+    assert row["hdd"] == pytest.approx(8.3)
+    assert row["cdd"] == 0.0
+    assert row["gdd"] == pytest.approx(5.0)
+
+
+def test_gdd_cap_and_custom_bases():
+    bases = DegreeDayBases(hdd_base=15.0, cdd_base=20.0, gdd_base=10.0, gdd_cap=30.0)
+    row = compute_degree_days(_obs("A", date(2020, 7, 1), 1, 400, 200), bases).row(0, named=True)
+    assert row["cdd"] == pytest.approx(10.0)
+    assert row["hdd"] == 0.0
+    # TMAX capped at 30: (30 + 20) / 2 - 10
+    assert row["gdd"] == pytest.approx(15.0)
+
+
+def test_skips_flagged_and_incomplete_days():
+    obs = _obs("A", date(2020, 1, 1), 3, 200, 0)
+    obs = obs.with_columns(
+        pl.when((pl.col("date") == date(2020, 1, 2)) & (pl.col("element") == "TMIN"))
+        .then(pl.lit("I"))
+        .otherwise(pl.col("qflag"))
+        .alias("qflag")
+    ).filter(~((pl.col("date") == date(2020, 1, 3)) & (pl.col("element") == "TMAX")))
+    assert compute_degree_days(obs)["date"].to_list() == [date(2020, 1, 1)]
+
+
+def test_heating_season_resets_in_july():
+    daily = compute_degree_days(_obs("A", date(2020, 6, 29), 4, 100, 0))
+    assert daily["heating_season"].to_list() == [2019, 2019, 2020, 2020]
+    hdd = 18.3 - 5.0
+    assert daily["hdd_season"].to_list() == pytest.approx([hdd, 2 * hdd, hdd, 2 * hdd])
+    # CDD/GDD accumulate over the calendar year
+    assert daily["gdd_season"].to_list() == pytest.approx([0.0] * 4)
+
+
+def test_monthly_and_seasonal_totals():
+    daily = compute_degree_days(_obs("A", date(2020, 1, 30), 4, 300, 100))
+    monthly = monthly_degree_days(daily)
+    assert monthly["month"].to_list() == [date(2020, 1, 1), date(2020, 2, 1)]
+    assert monthly["days"].to_list() == [2, 2]
+    assert monthly["gdd"].to_list() == pytest.approx([20.0, 20.0])
+
+    seasonal = seasonal_degree_days(daily)
+    gdd = seasonal.filter(pl.col("index") == "GDD")
+    assert gdd["season"].item() == 2020
+    assert gdd["total"].item() == pytest.approx(40.0)
+
+
+def test_join_stations():
+    daily = compute_degree_days(_obs("A", date(2020, 1, 1), 2, 200, 0))
+    stations = pl.DataFrame({"station_id": ["A", "B"], "name": ["ALPHA", "BETA"]})
+    joined = join_stations(daily, stations)
+    assert joined["name"].to_list() == ["ALPHA", "ALPHA"]
+
+
+def test_store_incremental_matches_full_recompute(tmp_path):
+    obs = pl.concat(
+        [
+            _obs("A", date(2020, 6, 20), 20, 150, 50),
+            _obs("B", date(2020, 12, 25), 12, 50, -50),
+        ]
+    )
+    store = DegreeDayStore(tmp_path / "dd")
+
+    # Feed the data in three overlapping batches
+    cut1, cut2 = date(2020, 6, 30), date(2020, 12, 31)
+    store.update(obs.filter(pl.col("date") <= cut1))
+    store.update(obs.filter(pl.col("date") <= cut2))
+    appended = store.update(obs)
+    assert appended["date"].min() > cut2
+
+    full = compute_degree_days(obs)
+    stored = store.daily().sort("station_id", "date").collect()
+    assert stored.height == full.height
+    for col in ("hdd_season", "cdd_season", "gdd_season"):
+        assert stored[col].to_list() == pytest.approx(full[col].to_list())
+
+    assert store.monthly().equals(monthly_degree_days(full))
+    assert store.state()["last_date"].to_list() == [date(2020, 7, 9), date(2021, 1, 5)]
+
+
+def test_store_update_is_noop_when_current(tmp_path):
+    obs = _obs("A", date(2020, 1, 1), 5, 200, 0)
+    store = DegreeDayStore(tmp_path / "dd")
+    store.update(obs)
+    assert store.update(obs).is_empty()
+    assert len(list((tmp_path / "dd" / "daily").glob("*.parquet"))) == 1
+
+
+def test_store_rejects_different_bases(tmp_path):
+    DegreeDayStore(tmp_path / "dd")
+    with pytest.raises(ValueError, match="was built with"):
+        DegreeDayStore(tmp_path / "dd", DegreeDayBases(hdd_base=15.0))
+
+
+def test_store_update_keeps_full_history_of_new_station(tmp_path):
+    store = DegreeDayStore(tmp_path / "dd")
+    store.update(_obs("A", date(2020, 1, 1), 10, 200, 0))
+    # B only appears now, with days older than anything stored for A
+    appended = store.update(
+        pl.concat([_obs("A", date(2020, 1, 1), 11, 200, 0), _obs("B", date(2019, 1, 1), 3, 200, 0)])
+    )
+    assert appended.filter(pl.col("station_id") == "A")["date"].to_list() == [date(2020, 1, 11)]
+    assert appended.filter(pl.col("station_id") == "B").height == 3
+
+
+def test_store_ignores_parts_of_interrupted_update(tmp_path):
+    obs = _obs("A", date(2020, 1, 1), 10, 200, 0)
+    store = DegreeDayStore(tmp_path / "dd")
+    store.update(obs.filter(pl.col("date") <= date(2020, 1, 5)))
+
+    # Simulate a crash after the parts of the next update were written, but
+    # before its state was: restore the previous state file
+    state_file = tmp_path / "dd" / "state.parquet"
+    committed = state_file.read_bytes()
+    store.update(obs)
+    state_file.write_bytes(committed)
+    assert store.daily().collect().height == 5
+
+    store.update(obs)
+    full = compute_degree_days(obs)
+    assert store.daily().sort("date").collect()["hdd_season"].to_list() == pytest.approx(
+        full["hdd_season"].to_list()
+    )
+    assert len(list((tmp_path / "dd" / "daily").glob("*.parquet"))) == 2
+
+
+def test_concurrent_updates_from_two_processes(tmp_path):
+    root = tmp_path / "dd"
+    DegreeDayStore(root)
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(2)
+    procs = [
+        ctx.Process(target=_update_process, args=(str(root), station_id, barrier))
+        for station_id in ("A", "B")
+    ]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(timeout=60)
+        assert proc.exitcode == 0
+
+    store = DegreeDayStore(root)
+    assert store.state()["station_id"].to_list() == ["A", "B"]
+    assert store.daily().collect().height == 10
+    assert len(list((root / "daily").glob("*.parquet"))) == 2
+
+
+def test_store_merges_parts(tmp_path):
+    obs = pl.concat(
+        [
+            _obs("A", date(2020, 1, 1), 10, 200, 0),
+            _obs("B", date(2020, 1, 3), 8, 100, -20),
+        ]
+    )
+    store = DegreeDayStore(tmp_path / "dd", max_parts=3)
+    for day in range(1, 11):
+        store.update(obs.filter(pl.col("date") <= date(2020, 1, day)))
+        assert len(store._parts()) <= 3
+
+    full = compute_degree_days(obs)
+    stored = store.daily().sort("station_id", "date").collect()
+    assert stored["hdd_season"].to_list() == pytest.approx(full["hdd_season"].to_list())
+    assert store.monthly().equals(monthly_degree_days(full))
+    # Parts replaced by the last merge are cleaned up by the following update
+    assert store.update(obs).is_empty()
+    assert len(list((tmp_path / "dd" / "daily").glob("*.parquet"))) == len(store._parts()) == 1
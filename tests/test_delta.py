@@ -0,0 +1,210 @@
+"""Tests for soa_weather.delta and delta-aware reads in soa_weather.read."""
+
+import threading
+import time
+from datetime import date
+
+import polars as pl
+import pytest
+
+from soa_weather import delta, snapshot
+from soa_weather.delta import append_delta, compact, delta_stats
+from soa_weather.ingest import commit_ingest, plan_shards, run_worker
+from soa_weather.main import main
+from soa_weather.read import read_dly, read_manifest, scan_dataset
+from soa_weather.schema import OBSERVATIONS_SCHEMA
+from soa_weather.snapshot import commit_snapshot, prune_snapshots
+
+from .conftest import dly_line
+
+
+def _rows(*rows: tuple) -> pl.DataFrame:
+    return pl.DataFrame(
+        [(*row, None, None, None) for row in rows],
+        schema=OBSERVATIONS_SCHEMA,
+        orient="row",
+    )
+
+
+def _value(dataset, station_id, day, element="TMAX"):
+    return (
+        scan_dataset(dataset)
+        .filter(
+            (pl.col("station_id") == station_id)
+            & (pl.col("date") == day)
+            & (pl.col("element") == element)
+        )
+        .collect()["value"]
+        .to_list()
+    )
+
+
+@pytest.fixture()
+def dataset(tmp_path, write_dly):
+    frames = [
+        read_dly(write_dly(s, [dly_line(s, 2020, 1, "TMAX", [10, 20, 30])]))
+        for s in ("USW00000001", "CA000000002")
+    ]
+    dataset = tmp_path / "dataset"
+    commit_snapshot(pl.concat(frames), dataset, version="2026-01")
+    return dataset
+
+
+def test_last_write_wins(dataset):
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 11)))
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 12)))
+    assert _value(dataset, "USW00000001", date(2020, 1, 1)) == [12]
+    # Untouched rows and partitions are unchanged
+    assert _value(dataset, "USW00000001", date(2020, 1, 2)) == [20]
+    assert scan_dataset(dataset).collect().height == 6
+
+
+def test_new_rows_and_new_partitions(dataset):
+    append_delta(
+        dataset,
+        _rows(
+            ("USW00000001", date(2020, 1, 4), "TMAX", 40),
+            ("MX000000003", date(2031, 5, 1), "PRCP", 7),
+        ),
+    )
+    assert scan_dataset(dataset).collect().height == 8
+    assert _value(dataset, "MX000000003", date(2031, 5, 1), "PRCP") == [7]
+
+
+def test_released_version_ignores_deltas(dataset):
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 99)))
+    released = scan_dataset(dataset, as_of="2026-01").filter(pl.col("value") == 99)
+    assert released.collect().is_empty()
+
+
+def test_compact_threshold(dataset):
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 11)))
+    # One changed row in a three-row partition is below a 50 % ratio
+    assert compact(dataset, max_delta_ratio=0.5) == []
+    assert compact(dataset, max_delta_ratio=0.3) == ["US-2020"]
+    assert delta_stats(dataset).is_empty()
+    assert _value(dataset, "USW00000001", date(2020, 1, 1)) == [11]
+
+
+def test_compact_retires_old_deltas(dataset):
+    delta_dir = dataset / "deltas" / "2026-01" / "US-2020"
+    for value in (11, 12):
+        append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", value)))
+        compact(dataset, force=True)
+    # The first delta was folded in by the first compaction and removed by the second
+    assert sorted(p.name for p in delta_dir.glob("*.parquet")) == ["000000000002.parquet"]
+    assert _value(dataset, "USW00000001", date(2020, 1, 1)) == [12]
+    assert read_manifest(dataset)["rows"] == 6
+    # The release itself still reads as published
+    assert scan_dataset(dataset, as_of="2026-01").collect()["value"].sum() == 120
+
+
+def test_compact_deltas_after_compaction_stay_pending(dataset):
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 11)))
+    compact(dataset, force=True)
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 13)))
+    assert delta_stats(dataset)["delta_files"].to_list() == [1]
+    assert _value(dataset, "USW00000001", date(2020, 1, 1)) == [13]
+
+
+def test_compact_with_append_in_progress(dataset, monkeypatch):
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 11)))
+    stats = delta._delta_stats
+
+    def append_then_stats(*args):
+        # A delta for a partition that did not exist when compaction listed them
+        append_delta(dataset, _rows(("MX000000003", date(2031, 5, 1), "PRCP", 7)))
+        return stats(*args)
+
+    monkeypatch.setattr(delta, "_delta_stats", append_then_stats)
+    assert compact(dataset, force=True) == ["US-2020"]
+    monkeypatch.undo()
+    assert delta_stats(dataset)["partition"].to_list() == ["MX-2030"]
+    assert _value(dataset, "MX000000003", date(2031, 5, 1), "PRCP") == [7]
+
+
+@pytest.mark.parametrize("operation", ["prune", "snapshot"])
+def test_snapshot_operations_wait_for_compaction(dataset, monkeypatch, operation):
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 11)))
+    write = delta.write_object
+    threads = []
+
+    def run_operation():
+        if operation == "prune":
+            prune_snapshots(dataset, keep=1)
+        else:
+            commit_snapshot(scan_dataset(dataset), dataset, version="2026-02")
+
+    def write_then_interleave(*args):
+        # The new object is not in any manifest yet
+        entry = write(*args)
+        threads.append(threading.Thread(target=run_operation))
+        threads[-1].start()
+        time.sleep(0.2)
+        return entry
+
+    monkeypatch.setattr(delta, "write_object", write_then_interleave)
+    assert compact(dataset, force=True) == ["US-2020"]
+    for thread in threads:
+        thread.join()
+
+    assert read_manifest(dataset)["version"] == ("2026-01" if operation == "prune" else "2026-02")
+    assert _value(dataset, "USW00000001", date(2020, 1, 1)) == [11]
+
+
+def test_append_during_snapshot_commit_lands_on_new_version(dataset, monkeypatch):
+    write = snapshot.atomic_write_text
+    switching = threading.Event()
+
+    def slow_write(path, text):
+        # Pause between the version file and manifest.json
+        if path.parent.name == "versions":
+            switching.set()
+            time.sleep(0.2)
+        write(path, text)
+
+    monkeypatch.setattr(snapshot, "atomic_write_text", slow_write)
+    base = scan_dataset(dataset).collect()
+    thread = threading.Thread(
+        target=commit_snapshot, args=(base, dataset), kwargs={"version": "2026-02"}
+    )
+    thread.start()
+    switching.wait()
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 11)))
+    thread.join()
+
+    assert (dataset / "deltas" / "2026-02").is_dir()
+    assert not (dataset / "deltas" / "2026-01").exists()
+    assert _value(dataset, "USW00000001", date(2020, 1, 1)) == [11]
+
+
+def test_deltas_on_ingest_dataset(tmp_path, write_dly):
+    for s in ("USW00000001", "USW00000002"):
+        write_dly(s, [dly_line(s, 2020, 1, "TMAX", [10])])
+    stations = pl.DataFrame({"station_id": ["USW00000001", "USW00000002"]})
+    queue = tmp_path / "queue"
+    plan_shards(stations, queue, version="v1", shard_size=1)
+    run_worker(queue, tmp_path / "ghcnd_all", wait=False)
+    commit_ingest(queue)
+
+    append_delta(
+        queue,
+        _rows(
+            ("USW00000002", date(2020, 1, 1), "TMAX", 15),
+            ("USW00000009", date(2020, 1, 1), "TMAX", 90),
+        ),
+    )
+    assert sorted(p.name for p in (queue / "deltas" / "v1").iterdir() if p.is_dir()) == [
+        "shard-00001",
+        "unassigned",
+    ]
+    before = scan_dataset(queue).sort("station_id").collect()
+    compact(queue, force=True)
+    assert scan_dataset(queue).sort("station_id").collect().equals(before)
+    assert before["value"].to_list() == [10, 15, 90]
+
+
+def test_compact_cli(dataset):
+    append_delta(dataset, _rows(("USW00000001", date(2020, 1, 1), "TMAX", 11)))
+    main(["compact", "--dataset-dir", str(dataset), "--force"])
+    assert delta_stats(dataset).is_empty()
@@ -0,0 +1,57 @@
+"""Tests for soa_weather.fixedwidth."""
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from soa_weather.fixedwidth import FixedWidthColumn, read_fixed_width
+
+LAYOUT = [
+    FixedWidthColumn("code", 1, 2),
+    FixedWidthColumn("value", 4, 8, pl.Float64),
+    FixedWidthColumn("count", 10, 12, pl.Int64),
+]
+
+
+def test_read_fixed_width_uniform_lines(tmp_path: Path):
+    path = tmp_path / "data.txt"
+    path.write_text("AA   1.5  10\nBB  -2.0 200\n")
+    df = read_fixed_width(path, LAYOUT)
+    assert df.schema == pl.Schema({"code": pl.String, "value": pl.Float64, "count": pl.Int64})
+    assert df.rows() == [("AA", 1.5, 10), ("BB", -2.0, 200)]
+
+
+def test_read_fixed_width_ragged_lines_are_padded(tmp_path: Path):
+    path = tmp_path / "data.txt"
+    path.write_text("AA   1.5  10\nBB  -2.0\nC\n")
+    df = read_fixed_width(path, LAYOUT)
+    assert df.rows() == [("AA", 1.5, 10), ("BB", -2.0, None), ("C", None, None)]
+
+
+def test_read_fixed_width_skips_blank_lines_and_crlf(tmp_path: Path):
+    path = tmp_path / "data.txt"
+    path.write_bytes(b"AA   1.5  10\r\n\r\n   \nBB  -2.0 200")
+    df = read_fixed_width(path, LAYOUT)
+    assert df["code"].to_list() == ["AA", "BB"]
+    assert df["count"].to_list() == [10, 200]
+
+
+def test_read_fixed_width_from_bytes():
+    df = read_fixed_width(b"AA   1.5  10\n", LAYOUT)
+    assert df.rows() == [("AA", 1.5, 10)]
+
+
+@pytest.mark.parametrize("content", [b"", b"\n\n"])
+def test_read_fixed_width_empty(tmp_path: Path, content: bytes):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(content)
+    df = read_fixed_width(path, LAYOUT)
+    assert df.is_empty()
+    assert df.columns == ["code", "value", "count"]
+
+
+def test_read_fixed_width_single_line(tmp_path: Path):
+    path = tmp_path / "one.txt"
+    path.write_text("ZZ   0.0   1")
+    assert read_fixed_width(path, LAYOUT).rows() == [("ZZ", 0.0, 1)]
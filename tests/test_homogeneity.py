@@ -0,0 +1,148 @@
+"""Tests for soa_weather.homogeneity."""
+
+import numpy as np
+import polars as pl
+import pytest
+
+from soa_weather.homogeneity import (
+    find_neighbors,
+    monthly_anomaly_matrix,
+    pair_statistics,
+    screen_homogeneity,
+)
+
+from .conftest import dly_line
+
+# ---------------------------------------------------------------------------
+# find_neighbors
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def stations() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "country_code": ["US", "US", "US", "US"],
+            "station_id": ["USW00000001", "USW00000002", "USW00000003", "USW00000004"],
+            "latitude": [40.0, 40.1, 40.2, 10.0],
+            "longitude": [-74.0, -74.0, -74.0, -74.0],
+        }
+    )
+
+
+def test_find_neighbors_nearest_first(stations):
+    df = find_neighbors(stations, k=2, max_distance_km=500)
+    first = df.filter(pl.col("station_id") == "USW00000001")
+    assert first["neighbor_id"].to_list() == ["USW00000002", "USW00000003"]
+    assert first["distance_km"][0] == pytest.approx(11.12, abs=0.05)
+
+
+def test_find_neighbors_distance_cutoff(stations):
+    df = find_neighbors(stations, k=3, max_distance_km=50)
+    assert "USW00000004" not in df["station_id"].to_list()
+    assert "USW00000004" not in df["neighbor_id"].to_list()
+
+
+def test_find_neighbors_chunked_matches_unchunked(stations):
+    whole = find_neighbors(stations, k=2, max_distance_km=500)
+    chunked = find_neighbors(stations, k=2, max_distance_km=500, chunk_size=1)
+    assert whole.equals(chunked)
+
+
+# ---------------------------------------------------------------------------
+# pair_statistics
+# ---------------------------------------------------------------------------
+
+
+def test_pair_statistics_detects_break():
+    rng = np.random.default_rng(0)
+    signal = rng.normal(size=(1, 120))
+    a = signal + rng.normal(scale=0.1, size=(1, 120))
+    b = signal + rng.normal(scale=0.1, size=(1, 120))
+    b[:, 60:] += 3.0
+
+    stats = pair_statistics(a, b, min_overlap=24)
+    assert stats["n_overlap"][0] == 120
+    assert stats["break_idx"][0] == 60
+    assert stats["snht"][0] > 50
+
+
+def test_pair_statistics_correlation_with_gaps():
+    rng = np.random.default_rng(1)
+    a = rng.normal(size=(2, 100))
+    b = a.copy()
+    b[1] = -b[1]
+    b[:, :10] = np.nan
+
+    stats = pair_statistics(a, b, min_overlap=24)
+    assert stats["n_overlap"].tolist() == [90, 90]
+    assert stats["correlation"] == pytest.approx([1.0, -1.0])
+
+
+def test_pair_statistics_min_overlap():
+    a = np.arange(10, dtype=float)[None, :]
+    stats = pair_statistics(a, a + 1, min_overlap=24)
+    assert np.isnan(stats["correlation"][0])
+    assert np.isnan(stats["snht"][0])
+    assert stats["break_idx"][0] == -1
+
+
+# ---------------------------------------------------------------------------
+# monthly_anomaly_matrix / screen_homogeneity
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def dly_dir(tmp_path, write_dly, stations):
+    rng = np.random.default_rng(42)
+    months = [(y, m) for y in range(2000, 2008) for m in range(1, 13)]
+    signal = rng.normal(scale=20, size=len(months))
+    for s, station_id in enumerate(stations["station_id"].to_list()):
+        lines = []
+        for i, (year, month) in enumerate(months):
+            level = 100 + signal[i] + rng.normal(scale=2)
+            if s == 2 and year >= 2004:
+                level += 60  # instrument change at the third station
+            lines.append(dly_line(station_id, year, month, "TMAX", [round(level)] * 28))
+        write_dly(station_id, lines)
+    return tmp_path / "ghcnd_all"
+
+
+def test_monthly_anomaly_matrix_shape(dly_dir, stations):
+    ids = stations["station_id"].to_list() + ["USW00000009"]
+    matrix, months = monthly_anomaly_matrix(ids, dly_dir, max_workers=2)
+    assert matrix.shape == (5, 96)
+    assert months[0] == np.datetime64("2000-01")
+    assert np.isnan(matrix[4]).all()
+    assert np.nanmean(matrix[0]) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_screen_homogeneity_flags_broken_station(dly_dir, stations):
+    df = screen_homogeneity(
+        stations,
+        dly_dir,
+        country_code="US",
+        k=2,
+        max_distance_km=50,
+        min_overlap=24,
+        max_workers=2,
+    )
+    assert df.columns == [
+        "station_id",
+        "neighbor_id",
+        "distance_km",
+        "n_overlap",
+        "correlation",
+        "snht",
+        "break_month",
+    ]
+    assert df.height == 6
+
+    clean = df.filter(
+        (pl.col("station_id") == "USW00000001") & (pl.col("neighbor_id") == "USW00000002")
+    )
+    broken = df.filter(
+        (pl.col("station_id") == "USW00000001") & (pl.col("neighbor_id") == "USW00000003")
+    )
+    assert broken["snht"].item() > clean["snht"].item()
+    assert str(broken["break_month"].item()) == "2004-01-01"
@@ -0,0 +1,155 @@
+"""Tests for soa_weather.ingest."""
+
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from soa_weather.ingest import IngestError, _Lease, commit_ingest, plan_shards, run_worker
+from soa_weather.read import scan_dataset
+
+from .conftest import dly_line
+
+STATION_IDS = [f"USW{i:08d}" for i in range(10)]
+
+
+@pytest.fixture()
+def dly_dir(tmp_path: Path, write_dly) -> Path:
+    for i, station_id in enumerate(STATION_IDS):
+        write_dly(station_id, [dly_line(station_id, 2020, 1, "TMAX", [i] * (i + 1))])
+    return tmp_path / "ghcnd_all"
+
+
+@pytest.fixture()
+def queue(tmp_path: Path) -> Path:
+    stations = pl.DataFrame({"station_id": STATION_IDS[::-1]})
+    queue_dir = tmp_path / "queue"
+    plan_shards(stations, queue_dir, version="2026-10", shard_size=3)
+    return queue_dir
+
+
+def _worker_process(queue_dir: str, dly_dir: str, worker_id: str) -> int:
+    return run_worker(Path(queue_dir), Path(dly_dir), worker_id=worker_id, poll_seconds=0.1)
+
+
+def _race_for_leases(lease_dir: str, owner: str, rounds: int, barrier, results) -> None:
+    # Widen the gap between checking a lease's age and acting on it
+    stat = Path.stat
+
+    def slow_stat(self, *args, **kwargs):
+        result = stat(self, *args, **kwargs)
+        if self.suffix == ".lease":
+            time.sleep(0.05)
+        return result
+
+    Path.stat = slow_stat
+    for i in range(rounds):
+        barrier.wait()
+        # Winners keep their lease (no release), so a second winner means a double claim
+        lease = _Lease.try_acquire(Path(lease_dir) / f"shard-{i:05d}.lease", owner, 10)
+        results.put((i, owner, lease is not None))
+
+
+def test_plan_shards_is_deterministic(queue: Path):
+    plan = json.loads((queue / "plan.json").read_text())
+    assert plan["shards"] == ["shard-00000", "shard-00001", "shard-00002", "shard-00003"]
+    first = json.loads((queue / "shards" / "shard-00000.json").read_text())
+    assert first["stations"] == STATION_IDS[:3]
+
+
+def test_plan_shards_refuses_existing_plan(queue: Path):
+    with pytest.raises(IngestError, match="already has an ingest plan"):
+        plan_shards(pl.DataFrame({"station_id": ["X"]}), queue, version="again")
+
+
+def test_single_worker_then_commit(queue: Path, dly_dir: Path):
+    assert run_worker(queue, dly_dir, worker_id="w1") == 4
+    commit_ingest(queue)
+
+    obs = scan_dataset(queue).collect()
+    assert obs.height == sum(range(1, 11))
+    assert sorted(obs["station_id"].unique().to_list()) == STATION_IDS
+    assert list((queue / "leases").iterdir()) == []
+
+    manifest = json.loads((queue / "manifest.json").read_text())
+    assert manifest["version"] == "2026-10"
+    assert manifest["rows"] == obs.height
+
+
+def test_commit_requires_all_shards(queue: Path):
+    with pytest.raises(IngestError, match="4 shard"):
+        commit_ingest(queue)
+
+
+def test_worker_without_plan(tmp_path: Path, dly_dir: Path):
+    with pytest.raises(IngestError, match="No ingest plan"):
+        run_worker(tmp_path / "nowhere", dly_dir)
+
+
+def test_live_lease_is_skipped(queue: Path, dly_dir: Path):
+    (queue / "leases" / "shard-00001.lease").write_text(json.dumps({"owner": "other"}))
+    assert run_worker(queue, dly_dir, worker_id="w1", wait=False) == 3
+    assert not (queue / "done" / "shard-00001.json").exists()
+
+
+def test_expired_lease_is_taken_over(queue: Path, dly_dir: Path):
+    # A worker that crashed mid-shard: stale lease and a half-written partition
+    lease = queue / "leases" / "shard-00001.lease"
+    lease.write_text(json.dumps({"owner": "crashed"}))
+    old = time.time() - 60
+    os.utime(lease, (old, old))
+    (queue / "parts" / "shard-00001.parquet.abc.tmp").write_bytes(b"partial")
+
+    assert run_worker(queue, dly_dir, worker_id="w1", lease_seconds=10) == 4
+    commit_ingest(queue)
+    assert scan_dataset(queue).collect().height == sum(range(1, 11))
+    assert list((queue / "parts").glob("*.tmp")) == []
+
+
+def test_multiple_processes_share_the_queue(queue: Path, dly_dir: Path):
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(3) as pool:
+        counts = pool.starmap(
+            _worker_process, [(str(queue), str(dly_dir), f"node-{i}") for i in range(3)]
+        )
+    # Every shard completed exactly once across the workers
+    assert sum(counts) == 4
+
+    commit_ingest(queue)
+    obs = scan_dataset(queue).collect()
+    assert obs.height == sum(range(1, 11))
+    assert obs.select("station_id", "date", "element").is_duplicated().sum() == 0
+
+
+def test_expired_lease_is_taken_over_by_exactly_one_process(tmp_path: Path):
+    rounds, workers = 10, 2
+    old = time.time() - 60
+    for i in range(rounds):
+        lease = tmp_path / f"shard-{i:05d}.lease"
+        lease.write_text(json.dumps({"owner": "crashed"}))
+        os.utime(lease, (old, old))
+
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(
+            target=_race_for_leases, args=(str(tmp_path), f"node-{w}", rounds, barrier, results)
+        )
+        for w in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    outcomes = [results.get(timeout=60) for _ in range(rounds * workers)]
+    for proc in procs:
+        proc.join()
+
+    for i in range(rounds):
+        winners = [owner for r, owner, won in outcomes if r == i and won]
+        assert len(winners) == 1
+        lease = json.loads((tmp_path / f"shard-{i:05d}.lease").read_text())
+        assert lease["owner"] == winners[0]
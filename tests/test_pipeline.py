@@ -0,0 +1,113 @@
+"""Tests for soa_weather.pipeline and the stage graph built by soa_weather.main."""
+
+import tarfile
+import time
+from pathlib import Path
+
+import pytest
+
+from soa_weather.main import build_pipeline
+from soa_weather.pipeline import PipelineError, Stage, run_stages
+
+from .conftest import dly_line
+
+# ---------------------------------------------------------------------------
+# run_stages
+# ---------------------------------------------------------------------------
+
+
+def test_run_stages_passes_dependency_results():
+    stages = [
+        Stage("total", lambda a, b: a + b, deps=("a", "b")),
+        Stage("a", lambda: 1),
+        Stage("b", lambda a: a + 1, deps=("a",)),
+    ]
+    run = run_stages(stages)
+    assert run.results == {"a": 1, "b": 2, "total": 3}
+
+
+def test_run_stages_overlaps_independent_stages():
+    stages = [Stage(name, lambda: time.sleep(0.3)) for name in ("a", "b", "c")]
+    run = run_stages(stages, max_workers=3)
+    assert run.elapsed < 0.8
+
+
+def test_run_stages_respects_dependencies():
+    stages = [
+        Stage("slow", lambda: time.sleep(0.2)),
+        Stage("after", lambda slow: None, deps=("slow",)),
+    ]
+    run = run_stages(stages)
+    assert run.timings["after"].start >= run.timings["slow"].end
+
+
+def test_run_stages_critical_path():
+    stages = [
+        Stage("fast", lambda: None),
+        Stage("slow", lambda: time.sleep(0.2)),
+        Stage("join", lambda fast, slow: None, deps=("fast", "slow")),
+    ]
+    run = run_stages(stages)
+    assert run.critical_path() == ["slow", "join"]
+
+
+def test_run_stages_propagates_errors():
+    def boom():
+        raise RuntimeError("boom")
+
+    ran = []
+    stages = [Stage("boom", boom), Stage("after", lambda boom: ran.append(1), deps=("boom",))]
+    with pytest.raises(RuntimeError, match="boom"):
+        run_stages(stages)
+    assert ran == []
+
+
+@pytest.mark.parametrize(
+    ("stages", "message"),
+    [
+        ([Stage("a", lambda: 1), Stage("a", lambda: 2)], "Duplicate"),
+        ([Stage("a", lambda b: 1, deps=("b",))], "unknown stage"),
+        (
+            [Stage("a", lambda b: 1, deps=("b",)), Stage("b", lambda a: 1, deps=("a",))],
+            "cycle",
+        ),
+    ],
+)
+def test_run_stages_invalid_graph(stages, message):
+    with pytest.raises(PipelineError, match=message):
+        run_stages(stages)
+
+
+# ---------------------------------------------------------------------------
+# build_pipeline
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture()
+def remote(tmp_path: Path) -> str:
+    """A fake GHCN server directory, served through ``file://`` URLs."""
+    src = tmp_path / "remote"
+    dly = src / "ghcnd_all"
+    dly.mkdir(parents=True)
+    (dly / "USW00094728.dly").write_text(dly_line("USW00094728", 2020, 1, "TMAX", [10]) + "\n")
+
+    (src / "ghcnd-countries.txt").write_text("US United States\n")
+    (src / "ghcnd-stations.txt").write_text(
+        "USW00094728  40.7789  -73.9692   39.6 NY NEW YORK CENTRAL PARK OBS      \n"
+        "USW00000001  40.0000  -74.0000   10.0 NJ NO DLY FILE                     \n"
+    )
+    with tarfile.open(src / "ghcnd_all.tar.gz", "w:gz") as tar:
+        tar.add(dly, arcname="ghcnd_all")
+    return src.as_uri() + "/"
+
+
+def test_build_pipeline_end_to_end(tmp_path: Path, remote: str):
+    data = tmp_path / "data"
+    run = run_stages(build_pipeline(remote, data))
+
+    stations = run.results["stations"]
+    assert stations["station_id"].to_list() == ["USW00094728"]
+    assert stations["country_name"].item() == "United States"
+    assert run.results["write"] == data / "stations_output.csv"
+    assert (data / "stations_output.csv").exists()
+    assert run.critical_path()[-1] == "write"
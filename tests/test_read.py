@@ -1,13 +1,27 @@
 """Tests for soa_weather.read — parsing functions."""
 
 import os
+import tarfile
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import polars as pl
 import pytest
 
-from soa_weather.read import _is_stale, _parse_stations_csv, _parse_stations_txt, load_countries
+from soa_weather.read import (
+    _is_stale,
+    _parse_stations_csv,
+    _parse_stations_txt,
+    _progress_hook,
+    find_dly_files,
+    iter_dly_tarball,
+    load_countries,
+    load_inventory,
+    read_dly,
+)
+from soa_weather.schema import INVENTORY_SCHEMA, OBSERVATIONS_SCHEMA
+
+from .conftest import dly_line
 
 # ---------------------------------------------------------------------------
 # load_countries
@@ -40,6 +54,31 @@ def test_load_countries_skips_blank_lines(tmp_path: Path):
     assert df.shape[0] == 2
 
 
+def test_load_countries_long_name(tmp_path: Path):
+    path = tmp_path / "countries.txt"
+    path.write_text("VC Saint Vincent and the Grenadines [United Kingdom]\n")
+    df = load_countries(path)
+    assert df["country_name"].item() == "Saint Vincent and the Grenadines [United Kingdom]"
+
+
+# ---------------------------------------------------------------------------
+# load_inventory
+# ---------------------------------------------------------------------------
+
+
+def test_load_inventory(tmp_path: Path):
+    path = tmp_path / "ghcnd-inventory.txt"
+    path.write_text(
+        "USW00094728  40.7789  -73.9692 TMAX 1869 2024\n"
+        "USW00094728  40.7789  -73.9692 PRCP 1869 2024\n"
+    )
+    df = load_inventory(path)
+    assert df.schema == INVENTORY_SCHEMA
+    assert df["element"].to_list() == ["TMAX", "PRCP"]
+    assert df["first_year"].to_list() == [1869, 1869]
+    assert df["latitude"][0] == pytest.approx(40.78)
+
+
 # ---------------------------------------------------------------------------
 # _parse_stations_txt
 # ---------------------------------------------------------------------------
@@ -77,6 +116,15 @@ def test_parse_stations_txt_values(stations_txt_file):
     assert "NEW YORK" in df["station_name"].item()
 
 
+def test_parse_stations_txt_short_lines(tmp_path: Path):
+    # Lines without trailing flag columns (or padding) still parse
+    path = tmp_path / "ghcnd-stations.txt"
+    path.write_text(STATIONS_TXT_LINE.rstrip() + "\n\n" + STATIONS_TXT_LINE + "\n")
+    df = _parse_stations_txt(path)
+    assert df.height == 2
+    assert df["station_name"].to_list() == ["NEW YORK CENTRAL PARK OBS"] * 2
+
+
 def test_parse_stations_txt_dtypes(stations_txt_file):
     df = _parse_stations_txt(stations_txt_file)
     assert df["latitude"].dtype == pl.Float64
@@ -136,3 +184,116 @@ def test_is_stale_fresh_file(tmp_path: Path):
     path = tmp_path / "fresh.txt"
     path.write_text("data")
     assert _is_stale(path) is False
+
+
+def test_progress_hook_logs_labelled_lines_at_intervals(caplog):
+    hook = _progress_hook("big.tar.gz", step_pct=25)
+    total = 100 * 1_048_576
+    with caplog.at_level("INFO", logger="soa_weather.read"):
+        for block in range(1, 101):
+            hook(block, 1_048_576, total)
+    messages = [r.getMessage() for r in caplog.records]
+    assert len(messages) == 5  # 1 %, 25 %, 50 %, 75 %, 100 %
+    assert all("big.tar.gz" in m and "\r" not in m for m in messages)
+
+
+def test_progress_hook_unknown_size(caplog):
+    hook = _progress_hook("stations.txt", step_mb=1)
+    with caplog.at_level("INFO", logger="soa_weather.read"):
+        for block in range(1, 9):
+            hook(block, 524_288, -1)
+    assert len(caplog.records) == 5  # first block, then every MB
+
+
+# ---------------------------------------------------------------------------
+# read_dly / find_dly_files
+# ---------------------------------------------------------------------------
+
+
+def test_read_dly_schema(write_dly):
+    path = write_dly("USW00094728", [dly_line("USW00094728", 2020, 1, "TMAX", [10, 20])])
+    df = read_dly(path)
+    assert df.schema == OBSERVATIONS_SCHEMA
+
+
+def test_read_dly_drops_missing_days(write_dly):
+    line = dly_line("USW00094728", 2020, 2, "PRCP", [5, None, 7])
+    df = read_dly(write_dly("USW00094728", [line]))
+    assert df["value"].to_list() == [5, 7]
+    assert df["date"].dt.day().to_list() == [1, 3]
+
+
+def test_read_dly_flags(write_dly):
+    line = dly_line("USW00094728", 2020, 1, "TMIN", [-15, -20], qflags={2: "I"})
+    df = read_dly(write_dly("USW00094728", [line]))
+    assert df["qflag"].to_list() == [None, "I"]
+    assert df["mflag"].null_count() == 2
+
+
+@pytest.fixture()
+def mixed_dly(write_dly) -> Path:
+    return write_dly(
+        "USW00094728",
+        [
+            dly_line("USW00094728", 1999, 12, "TMAX", [10, 20]),
+            dly_line("USW00094728", 2000, 1, "TMAX", [30, 40], qflags={1: "I"}),
+            dly_line("USW00094728", 2000, 1, "PRCP", [5]),
+            dly_line("USW00094728", 2001, 1, "TMIN", [-5]),
+        ],
+    )
+
+
+def test_read_dly_element_filter(mixed_dly):
+    df = read_dly(mixed_dly, elements=["TMAX", "TMIN"])
+    assert set(df["element"]) == {"TMAX", "TMIN"}
+    assert df.height == 5
+
+
+def test_read_dly_year_filter(mixed_dly):
+    df = read_dly(mixed_dly, years=(2000, 2000))
+    assert df["date"].dt.year().unique().to_list() == [2000]
+    assert df.height == 3
+
+
+def test_read_dly_drop_flagged(mixed_dly):
+    df = read_dly(mixed_dly, elements=["TMAX"], drop_flagged=True)
+    assert df["value"].to_list() == [10, 20, 40]
+    assert df["qflag"].null_count() == df.height
+
+
+def test_read_dly_filters_match_post_filtering(mixed_dly):
+    filtered = read_dly(mixed_dly, elements=["TMAX"], years=(2000, 2001), drop_flagged=True)
+    expected = read_dly(mixed_dly).filter(
+        (pl.col("element") == "TMAX")
+        & pl.col("date").dt.year().is_between(2000, 2001)
+        & pl.col("qflag").is_null()
+    )
+    assert filtered.equals(expected)
+
+
+def test_read_dly_no_match_keeps_schema(mixed_dly):
+    assert read_dly(mixed_dly, elements=["SNOW"]).schema == OBSERVATIONS_SCHEMA
+
+
+def test_read_dly_bytes(mixed_dly):
+    assert read_dly(mixed_dly.read_bytes()).equals(read_dly(mixed_dly))
+
+
+def test_iter_dly_tarball(tmp_path: Path, write_dly):
+    for station_id in ("USW00000001", "USW00000002"):
+        write_dly(station_id, [dly_line(station_id, 2000, 1, "TMAX", [1, 2])])
+    tar_file = tmp_path / "ghcnd_all.tar.gz"
+    with tarfile.open(tar_file, "w:gz") as tar:
+        tar.add(tmp_path / "ghcnd_all", arcname="ghcnd_all")
+
+    members = dict(iter_dly_tarball(tar_file, station_ids={"USW00000002"}, elements=["TMAX"]))
+    assert list(members) == ["USW00000002"]
+    assert members["USW00000002"].equals(read_dly(tmp_path / "ghcnd_all" / "USW00000002.dly"))
+
+
+def test_find_dly_files_nested(tmp_path: Path):
+    nested = tmp_path / "ghcnd_all" / "ghcnd_all"
+    nested.mkdir(parents=True)
+    (nested / "USW00094728.dly").write_text("")
+    files = find_dly_files(tmp_path / "ghcnd_all")
+    assert files == {"USW00094728": nested / "USW00094728.dly"}
@@ -0,0 +1,109 @@
+"""Tests for soa_weather.snapshot and versioned reads in soa_weather.read."""
+
+import json
+from datetime import date
+
+import polars as pl
+import pytest
+
+from soa_weather.read import read_dly, read_manifest, scan_dataset, scan_table
+from soa_weather.snapshot import (
+    SnapshotError,
+    commit_snapshot,
+    list_versions,
+    prune_snapshots,
+)
+
+from .conftest import dly_line
+
+
+@pytest.fixture()
+def obs(write_dly):
+    frames = [
+        read_dly(
+            write_dly(
+                station_id,
+                [
+                    dly_line(station_id, 1995, 1, "TMAX", [10, 20, 30]),
+                    dly_line(station_id, 2020, 1, "TMAX", [40, 50]),
+                ],
+            )
+        )
+        for station_id in ("USW00000001", "CA000000002")
+    ]
+    return pl.concat(frames)
+
+
+def _objects(dataset_dir):
+    return sorted((dataset_dir / "objects").glob("*/*.parquet"))
+
+
+def test_commit_and_scan(tmp_path, obs):
+    dataset = tmp_path / "dataset"
+    stations = pl.DataFrame({"station_id": ["USW00000001", "CA000000002"]})
+    commit_snapshot(obs, dataset, version="2026-01", tables={"stations": stations})
+
+    manifest = read_manifest(dataset)
+    assert manifest["version"] == "2026-01"
+    assert sorted(p["name"] for p in manifest["partitions"]) == [
+        "CA-1990",
+        "CA-2020",
+        "US-1990",
+        "US-2020",
+    ]
+    result = scan_dataset(dataset).sort("station_id", "date").collect()
+    assert result.equals(obs.sort("station_id", "date"))
+    assert scan_table(dataset, "stations").collect().equals(stations)
+
+
+def test_unchanged_partitions_are_shared(tmp_path, obs):
+    dataset = tmp_path / "dataset"
+    commit_snapshot(obs, dataset, version="2026-01")
+    first = _objects(dataset)
+
+    # A new day in 2020 for one station changes exactly one partition
+    extra = obs.filter(pl.col("station_id") == "USW00000001").tail(1)
+    extra = extra.with_columns(pl.lit(date(2020, 1, 3)).alias("date"))
+    commit_snapshot(pl.concat([obs, extra]), dataset, version="2026-02")
+
+    assert len(_objects(dataset)) == len(first) + 1
+    assert read_manifest(dataset)["parent"] == "2026-01"
+    assert scan_dataset(dataset).collect().height == obs.height + 1
+    assert scan_dataset(dataset, as_of="2026-01").collect().height == obs.height
+
+
+def test_as_of_date_picks_latest_version_on_or_before(tmp_path, obs):
+    dataset = tmp_path / "dataset"
+    commit_snapshot(obs, dataset, version="2026-01")
+    assert read_manifest(dataset, as_of=date(2999, 1, 1))["version"] == "2026-01"
+    with pytest.raises(ValueError, match="on or before"):
+        read_manifest(dataset, as_of=date(2000, 1, 1))
+    with pytest.raises(ValueError, match="No version"):
+        scan_dataset(dataset, as_of="1999-12")
+
+
+def test_duplicate_and_invalid_versions(tmp_path, obs):
+    dataset = tmp_path / "dataset"
+    commit_snapshot(obs, dataset, version="2026-01")
+    with pytest.raises(SnapshotError, match="already exists"):
+        commit_snapshot(obs, dataset, version="2026-01")
+    with pytest.raises(SnapshotError, match="Invalid"):
+        commit_snapshot(obs, dataset, version="../escape")
+
+
+def test_prune_keeps_newest_and_shared_objects(tmp_path, obs):
+    dataset = tmp_path / "dataset"
+    for i, cutoff in enumerate([1, 2, 3], start=1):
+        # Each version drops fewer 2020 rows, so only the 2020 partitions change
+        subset = obs.filter((pl.col("date").dt.year() < 2000) | (pl.col("date").dt.day() <= cutoff))
+        commit_snapshot(subset, dataset, version=f"2026-0{i}")
+
+    removed = prune_snapshots(dataset, keep=1)
+    assert list_versions(dataset)["version"].to_list() == ["2026-03"]
+    assert removed > 0
+    # Every remaining reference still resolves
+    assert scan_dataset(dataset, as_of="2026-03").collect().height == obs.height
+    referenced = {
+        p["path"] for p in json.loads((dataset / "manifest.json").read_text())["partitions"]
+    }
+    assert {o.relative_to(dataset).as_posix() for o in _objects(dataset)} == referenced
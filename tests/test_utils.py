@@ -3,7 +3,10 @@
 import platform
 from pathlib import Path
 
-from soa_weather.utils import data_dir
+import polars as pl
+import pytest
+
+from soa_weather.utils import atomic_write_parquet, atomic_write_text, cache_dir, data_dir
 
 
 def test_data_dir_returns_path():
@@ -24,3 +27,35 @@ def test_data_dir_env_override(monkeypatch):
     monkeypatch.setenv("SOA_WEATHER_DATA", "/tmp/custom")
     result = data_dir()
     assert result == Path("/tmp/custom")
+
+
+def test_cache_dir_default(monkeypatch, tmp_path):
+    monkeypatch.delenv("SOA_WEATHER_CACHE", raising=False)
+    monkeypatch.setenv("SOA_WEATHER_DATA", str(tmp_path))
+    assert cache_dir() == tmp_path / "cache"
+
+
+def test_cache_dir_env_override(monkeypatch, tmp_path):
+    monkeypatch.setenv("SOA_WEATHER_CACHE", str(tmp_path / "shared"))
+    assert cache_dir() == tmp_path / "shared"
+    assert cache_dir().is_dir()
+
+
+def test_atomic_write_text_replaces(tmp_path):
+    path = tmp_path / "state.json"
+    atomic_write_text(path, "old")
+    atomic_write_text(path, "new")
+    assert path.read_text() == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
+
+
+def test_atomic_write_parquet_keeps_old_file_on_failure(tmp_path):
+    path = tmp_path / "part.parquet"
+    df = pl.DataFrame({"a": [1, 2]})
+    atomic_write_parquet(path, df, metadata={"k": "v"})
+    assert pl.read_parquet_metadata(path)["k"] == "v"
+
+    with pytest.raises(TypeError):
+        atomic_write_parquet(path, pl.DataFrame({"a": [3]}), no_such_option=True)
+    assert pl.read_parquet(path).equals(df)
+    assert [p.name for p in tmp_path.iterdir()] == ["part.parquet"]
@@ -1,10 +1,15 @@
 """Tests for soa_weather.write."""
 
+from datetime import date
 from pathlib import Path
 
+import numpy as np
 import polars as pl
 
-from soa_weather.write import write_stations_csv
+from soa_weather.read import open_station_matrix
+from soa_weather.write import write_completeness, write_station_matrix, write_stations_csv
+
+from .conftest import dly_line
 
 
 def test_write_stations_csv_roundtrip(tmp_path: Path):
@@ -30,3 +35,50 @@ def test_write_stations_csv_creates_file(tmp_path: Path):
     write_stations_csv(df, out)
     assert out.exists()
     assert out.stat().st_size > 0
+
+
+def test_write_completeness_roundtrip(tmp_path: Path):
+    df = pl.DataFrame({"station_id": ["USW00094728"], "year": [2020], "pct_complete": [99.5]})
+    out = tmp_path / "completeness.parquet"
+    write_completeness(df, out)
+    assert pl.read_parquet(out).equals(df)
+
+
+def test_write_station_matrix(tmp_path: Path, write_dly):
+    write_dly(
+        "USW00000001",
+        [
+            dly_line("USW00000001", 2020, 1, "PRCP", [5, None, 7]),
+            dly_line("USW00000001", 2020, 1, "TMAX", [100, 100, 100]),
+        ],
+    )
+    write_dly(
+        "USW00000002",
+        [
+            dly_line("USW00000002", 2019, 12, "PRCP", [1] * 31),
+            dly_line("USW00000002", 2020, 1, "PRCP", [3, 4], qflags={2: "I"}),
+        ],
+    )
+    stations = pl.DataFrame({"station_id": ["USW00000002", "USW00000003", "USW00000001"]})
+    out = tmp_path / "prcp"
+    write_station_matrix(
+        stations,
+        tmp_path / "ghcnd_all",
+        out,
+        element="PRCP",
+        start=date(2020, 1, 1),
+        end=date(2020, 1, 10),
+        max_workers=2,
+    )
+
+    values, station_ids, dates = open_station_matrix(out)
+    assert isinstance(values, np.memmap)
+    assert values.shape == (3, 10)
+    assert values.dtype == np.float32
+    assert station_ids.tolist() == ["USW00000002", "USW00000003", "USW00000001"]
+    assert dates[0] == np.datetime64("2020-01-01")
+    assert dates[-1] == np.datetime64("2020-01-10")
+
+    np.testing.assert_array_equal(values[2, :4], [5, np.nan, 7, np.nan])
+    np.testing.assert_array_equal(values[0, :3], [3, np.nan, np.nan])  # flagged day dropped
+    assert np.isnan(values[1]).all()